@@ -1,8 +1,9 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.utils import timezone
 
 from .forms import CustomUserCreationForm, CustomUserChangeForm
-from .models import CustomUser
+from .models import CustomUser, OutboxEmail
 
 
 class CustomUserAdmin(UserAdmin):
@@ -46,3 +47,31 @@ class CustomUserAdmin(UserAdmin):
 
 
 admin.site.register(CustomUser, CustomUserAdmin)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        "subject",
+        "recipients",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "created_at",
+        "sent_at",
+    )
+    list_filter = ("status",)
+    search_fields = ("subject", "recipients")
+    readonly_fields = ("created_at", "sent_at", "last_error")
+    # The bodies contain live tokens (activation, password reset links)
+    exclude = ("body", "html_body")
+    actions = ["retry_now"]
+
+    @admin.action(description="Retry the selected emails now")
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=OutboxEmail.Status.SENT).update(
+            status=OutboxEmail.Status.PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f"{updated} emails queued for sending.")
@@ -1,46 +1,62 @@
-# from threading import Thread
-
-from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.contrib.sites.shortcuts import get_current_site
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
-from django.utils.translation import gettext as _
+from django.utils.translation import gettext_lazy as _
 
+from lib.email_templates import EmailTemplate
+from lib.rate_limit import get_client_ip, take_tokens
 
-def send_verification_email(user, request):
-    # def _send_email():
-    token = default_token_generator.make_token(user)
-    uid = urlsafe_base64_encode(force_bytes(user.pk))
-    current_site = get_current_site(request)
-
-    mail_subject = _("Activate your account")
-    txt_message = render_to_string(
-        "accounts/verification_email.txt",
-        {
-            "user": user,
-            "domain": current_site.domain,
-            "uid": uid,
-            "token": token,
-        },
+from .outbox import enqueue_email, is_pending
+
+# Token buckets for resending verification emails: (capacity, seconds per
+# refilled token). A user gets 3 emails, then one every 10 minutes; an IP
+# (many accounts from one client) 10, then one per minute.
+VERIFICATION_EMAIL_USER_LIMIT = (3, 600)
+VERIFICATION_EMAIL_IP_LIMIT = (10, 60)
+
+VERIFICATION_EMAIL = EmailTemplate(
+    _("Activate your account"),
+    "accounts/verification_email.txt",
+    "accounts/verification_email.html",
+    fields=("username", "domain", "uid", "token"),
+)
+
+
+def get_verification_dedup_key(user):
+    # The token differs on every render, so dedup on user and address
+    return f"verification:{user.pk}:{user.email}"
+
+
+def can_resend_verification_email(user, request):
+    """
+    Whether another verification email may be sent: none is pending for the
+    user and neither the user's nor the client's rate limit is exhausted.
+    """
+    if is_pending(get_verification_dedup_key(user)):
+        return False
+    return take_tokens(
+        [
+            (f"verification_email:user:{user.pk}", *VERIFICATION_EMAIL_USER_LIMIT),
+            (
+                f"verification_email:ip:{get_client_ip(request)}",
+                *VERIFICATION_EMAIL_IP_LIMIT,
+            ),
+        ]
     )
-    html_message = render_to_string(
-        "accounts/verification_email.html",
-        {
-            "user": user,
-            "domain": current_site.domain,
-            "uid": uid,
-            "token": token,
-        },
+
+
+def send_verification_email(user, request):
+    subject, txt_message, html_message = VERIFICATION_EMAIL.render(
+        username=user.username,
+        domain=request.get_host(),
+        uid=urlsafe_base64_encode(force_bytes(user.pk)),
+        token=default_token_generator.make_token(user),
     )
-    send_mail(
-        mail_subject,
+    # Sent by `manage.py send_outbox`, the request doesn't wait for SMTP
+    enqueue_email(
+        subject,
         txt_message,
-        settings.DEFAULT_FROM_EMAIL,
         [user.email],
-        html_message=html_message,
+        html_body=html_message,
+        dedup_key=get_verification_dedup_key(user),
     )
-
-    # Thread(target=_send_email).start()
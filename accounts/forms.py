@@ -6,6 +6,7 @@ from django.contrib.auth.forms import (
     PasswordResetForm,
     SetPasswordForm,
 )
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
@@ -16,7 +17,8 @@ from crispy_bootstrap5.bootstrap5 import FloatingField
 
 
 from .models import CustomUser
-from .utils import PROFANITIES
+from .outbox import enqueue_email
+from .utils import contains_profanity
 
 
 class CustomUserCreationForm(UserCreationForm):
@@ -39,8 +41,7 @@ class CustomUserCreationForm(UserCreationForm):
 
     def clean_username(self):
         username = self.cleaned_data.get("username")
-        username_lower = username.lower()
-        if any(word in username_lower for word in PROFANITIES):
+        if contains_profanity(username):
             raise forms.ValidationError(
                 _("The username contains not allowed characters or expressions.")
             )
@@ -127,8 +128,7 @@ class CustomUserChangeForm(UserChangeForm):
 
     def clean_username(self):
         username = self.cleaned_data.get("username")
-        username_lower = username.lower()
-        if any(word in username_lower for word in PROFANITIES):
+        if contains_profanity(username):
             raise forms.ValidationError(
                 _("The username contains not allowed characters or expressions.")
             )
@@ -220,6 +220,33 @@ class CustomPasswordResetForm(PasswordResetForm):
             ),
         )
 
+    def send_mail(
+        self,
+        subject_template_name,
+        email_template_name,
+        context,
+        from_email,
+        to_email,
+        html_email_template_name=None,
+    ):
+        """Queue the reset email in the outbox instead of sending it inline."""
+        subject = render_to_string(subject_template_name, context)
+        # Email subject *must not* contain newlines
+        subject = "".join(subject.splitlines())
+        body = render_to_string(email_template_name, context)
+        html_body = ""
+        if html_email_template_name is not None:
+            html_body = render_to_string(html_email_template_name, context)
+        # The token differs on every render: one pending reset per address
+        enqueue_email(
+            subject,
+            body,
+            [to_email],
+            html_body=html_body,
+            from_email=from_email,
+            dedup_key=f"password_reset:{to_email}",
+        )
+
 
 class CustomSetPasswordForm(SetPasswordForm):
     """Used in Password Reset Confirm View."""
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from accounts.utils import COMPILED_PROFANITIES_FILE_PATH, compile_profanities
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile the profanity CSVs in accounts/profanity/ into the matcher "
+        "tables loaded by the username validation"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            type=Path,
+            default=COMPILED_PROFANITIES_FILE_PATH,
+            help="File to write. Default: accounts/profanity/profanities.json",
+        )
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        count = compile_profanities(output)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Compiled {count} profanities to {output} "
+                f"({output.stat().st_size / 1024:.1f} KB)"
+            )
+        )
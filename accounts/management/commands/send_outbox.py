@@ -0,0 +1,103 @@
+import signal
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from accounts.outbox import (
+    BATCH_SIZE,
+    KEEP_FOR,
+    MAX_ATTEMPTS,
+    OutboxSender,
+    prune_emails,
+)
+
+# Seconds between prunes of old sent/failed emails while running as a worker
+PRUNE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = (
+        "Send the emails queued in the outbox (accounts.outbox). Runs as a "
+        "worker polling the outbox until stopped, or drains it once with --once"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send all due emails and exit",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds between polls when the outbox is empty. Default: 5",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help=f"Emails per send_messages() call. Default: {BATCH_SIZE}",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=MAX_ATTEMPTS,
+            help=f"Attempts before an email is marked failed. Default: {MAX_ATTEMPTS}",
+        )
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=KEEP_FOR.days,
+            help=(
+                "Days to keep sent and failed emails before deleting them. "
+                f"Default: {KEEP_FOR.days}"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["max_attempts"] < 1:
+            raise CommandError("--batch-size and --max-attempts must be at least 1")
+        if options["keep_days"] < 0:
+            raise CommandError("--keep-days must not be negative")
+        keep_for = timedelta(days=options["keep_days"])
+
+        self.running = True
+        if not options["once"]:
+            # Finish the current batch on `docker stop`
+            signal.signal(signal.SIGTERM, self.stop)
+            self.stdout.write("📬 Outbox worker started")
+
+        sender = OutboxSender(options["batch_size"], options["max_attempts"])
+        pruned_at = None
+        try:
+            while self.running:
+                close_old_connections()
+                if pruned_at is None or time.monotonic() - pruned_at >= PRUNE_INTERVAL:
+                    pruned = prune_emails(keep_for)
+                    pruned_at = time.monotonic()
+                    if pruned:
+                        self.stdout.write(f"🧹 Deleted {pruned} old emails")
+                sent, failed = sender.send_due()
+                if sent or failed:
+                    self.stdout.write(f"📨 Sent {sent}, failed {failed}")
+
+                # A full batch means more emails may be due right away
+                if sent + failed >= options["batch_size"]:
+                    continue
+                # Don't keep an idle SMTP connection open while polling
+                sender.close()
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sender.close()
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Outbox: {sender.stats}"))
+
+    def stop(self, signum, frame):
+        self.running = False
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0012_outboxemail"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxemail",
+            name="dedup_key",
+            field=models.CharField(
+                blank=True, max_length=255, verbose_name="dedup key"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="outboxemail",
+            index=models.Index(
+                fields=["dedup_key", "status"], name="accounts_ou_dedup_k_c55fe7_idx"
+            ),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.core import validators
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -46,3 +47,49 @@ class CustomUser(AbstractUser):
     languages_highscore = models.PositiveSmallIntegerField(
         null=False, default=0, blank=True
     )
+
+
+class OutboxEmail(models.Model):
+    """
+    An email waiting to be sent by `manage.py send_outbox`, so requests
+    never wait for the SMTP server (see `accounts.outbox`).
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        SENT = "sent", _("Sent")
+        FAILED = "failed", _("Failed")
+
+    subject = models.CharField(_("subject"), max_length=255)
+    body = models.TextField(_("body"))
+    html_body = models.TextField(_("HTML body"), blank=True, default="")
+    from_email = models.CharField(_("from"), max_length=254)
+    recipients = models.JSONField(_("recipients"), default=list)
+    # Pending emails with the same key are only queued once (see
+    # `accounts.outbox.enqueue_email`)
+    dedup_key = models.CharField(_("dedup key"), max_length=255, blank=True)
+
+    status = models.CharField(
+        _("status"),
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(_("attempts"), default=0)
+    next_attempt_at = models.DateTimeField(_("next attempt"), default=timezone.now)
+    last_error = models.TextField(_("last error"), blank=True, default="")
+
+    created_at = models.DateTimeField(_("created"), auto_now_add=True)
+    sent_at = models.DateTimeField(_("sent"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Outbox Email")
+        verbose_name_plural = _("Outbox Emails")
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+            models.Index(fields=["dedup_key", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)}"
@@ -0,0 +1,283 @@
+"""
+Database-backed email outbox.
+
+Views only store the email (`enqueue_email`), which is one INSERT, instead of
+talking to the SMTP server inside the request. An email that is already
+waiting in the outbox is not queued a second time. `manage.py send_outbox` drains
+the outbox in the background with an `OutboxSender`: it sends the due emails
+in batches (one `send_messages()` call each) over an SMTP connection reused
+across batches, and retries failed ones with an exponential backoff until
+`max_attempts` is reached. `OutboxSender.stats` tracks the throughput.
+
+Sent emails keep no body, as it may contain live tokens (activation, password
+reset); `prune_emails` deletes sent and failed emails after `KEEP_FOR`.
+"""
+
+import hashlib
+import json
+import logging
+import smtplib
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger("nethz_django.outbox")
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 5
+# Delay before the n-th retry: 30s, 1min, 2min, ... capped at 1 hour
+RETRY_BASE_DELAY = timedelta(seconds=30)
+RETRY_MAX_DELAY = timedelta(hours=1)
+# Errors of the SMTP server or the connection to it
+SMTP_ERRORS = (smtplib.SMTPException, OSError)
+# Sent and failed emails are deleted after this long
+KEEP_FOR = timedelta(days=30)
+
+
+def get_dedup_key(subject, body, recipients, html_body="", from_email=""):
+    """Key of an email's content, identical emails share it."""
+    content = json.dumps([subject, body, html_body, from_email, sorted(recipients)])
+    return "sha256:" + hashlib.sha256(content.encode()).hexdigest()
+
+
+def is_pending(dedup_key):
+    """Whether an email with `dedup_key` is waiting to be sent."""
+    return OutboxEmail.objects.filter(
+        dedup_key=dedup_key, status=OutboxEmail.Status.PENDING
+    ).exists()
+
+
+def enqueue_email(
+    subject, body, recipients, html_body="", from_email=None, dedup_key=None
+):
+    """
+    Store an email for `manage.py send_outbox` and return it.
+
+    If an email with the same `dedup_key` (default: a hash of the content)
+    is still pending, that one is returned instead of queueing another.
+    Pass a key when the content differs on each call (e.g. a fresh token)
+    but only one such email should wait in the outbox.
+    """
+    from_email = from_email or settings.DEFAULT_FROM_EMAIL
+    recipients = list(recipients)
+    if dedup_key is None:
+        dedup_key = get_dedup_key(subject, body, recipients, html_body, from_email)
+
+    pending = (
+        OutboxEmail.objects.filter(
+            dedup_key=dedup_key, status=OutboxEmail.Status.PENDING
+        )
+        .order_by("pk")
+        .first()
+    )
+    if pending is not None:
+        return pending
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        from_email=from_email,
+        recipients=recipients,
+        dedup_key=dedup_key,
+    )
+
+
+def retry_delay(attempts):
+    """Backoff after the `attempts`-th failed attempt."""
+    return min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+
+
+def get_due_emails(batch_size=BATCH_SIZE):
+    return list(
+        OutboxEmail.objects.filter(
+            status=OutboxEmail.Status.PENDING,
+            next_attempt_at__lte=timezone.now(),
+        ).order_by("next_attempt_at", "pk")[:batch_size]
+    )
+
+
+def build_message(email, connection=None):
+    message = EmailMultiAlternatives(
+        email.subject,
+        email.body,
+        email.from_email,
+        email.recipients,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def mark_failed(email, error, max_attempts=MAX_ATTEMPTS):
+    email.attempts += 1
+    email.last_error = f"{type(error).__name__}: {error}"
+    if email.attempts >= max_attempts:
+        email.status = OutboxEmail.Status.FAILED
+        logger.error(
+            "Outbox: giving up on email %s after %d attempts: %s",
+            email.pk,
+            email.attempts,
+            email.last_error,
+        )
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+        logger.warning(
+            "Outbox: email %s failed (attempt %d), retrying at %s: %s",
+            email.pk,
+            email.attempts,
+            email.next_attempt_at,
+            email.last_error,
+        )
+    email.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+
+
+def iter_messages(emails, connection, attempted):
+    """
+    Messages of `emails`, appending each email to `attempted` when its
+    message is handed out. send_messages() sends in order and stops at the
+    first error, so the last attempted email is the one that failed.
+    """
+    for email in emails:
+        attempted.append(email)
+        yield build_message(email, connection)
+
+
+def mark_sent(emails):
+    OutboxEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+        status=OutboxEmail.Status.SENT,
+        sent_at=timezone.now(),
+        attempts=F("attempts") + 1,
+        last_error="",
+        # Don't keep the tokens of sent emails around
+        body="",
+        html_body="",
+    )
+
+
+def prune_emails(keep_for=KEEP_FOR):
+    """Delete sent and failed emails older than `keep_for`. Returns the count."""
+    deleted, _ = OutboxEmail.objects.filter(
+        status__in=[OutboxEmail.Status.SENT, OutboxEmail.Status.FAILED],
+        created_at__lt=timezone.now() - keep_for,
+    ).delete()
+    return deleted
+
+
+@dataclass
+class OutboxStats:
+    """Throughput of an `OutboxSender`."""
+
+    sent: int = 0
+    failed: int = 0
+    batches: int = 0
+    connections: int = 0
+    # Seconds spent sending (without waiting for new emails)
+    send_time: float = 0.0
+
+    @property
+    def per_second(self):
+        return self.sent / self.send_time if self.send_time else 0.0
+
+    def __str__(self):
+        return (
+            f"sent {self.sent}, failed {self.failed} in {self.batches} batches "
+            f"over {self.connections} connections, {self.send_time:.2f}s "
+            f"({self.per_second:.1f} emails/s)"
+        )
+
+
+class OutboxSender:
+    """
+    Sends due emails in batches, each batch with one `send_messages()` call
+    on an SMTP connection that stays open across batches until `close()`.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.connection = None
+        self.stats = OutboxStats()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def open(self):
+        if self.connection is None:
+            connection = get_connection()
+            connection.open()
+            self.connection = connection
+            self.stats.connections += 1
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except SMTP_ERRORS:
+                logger.warning("Outbox: closing the SMTP connection failed")
+            self.connection = None
+
+    def send_due(self):
+        """Send one batch of due emails. Returns (number sent, number failed)."""
+        emails = get_due_emails(self.batch_size)
+        if not emails:
+            return 0, 0
+
+        started_at = time.perf_counter()
+        sent = failed = 0
+        while emails:
+            try:
+                connection = self.open()
+            except SMTP_ERRORS as e:
+                # Server unreachable: the remaining emails count as an attempt
+                for email in emails:
+                    mark_failed(email, e, self.max_attempts)
+                failed += len(emails)
+                break
+
+            attempted = []
+            try:
+                connection.send_messages(iter_messages(emails, connection, attempted))
+            except SMTP_ERRORS as e:
+                # Reconnect for the remaining emails, the connection may be
+                # broken
+                self.close()
+                if attempted:
+                    mark_failed(attempted.pop(), e, self.max_attempts)
+                    failed += 1
+                    emails = emails[len(attempted) + 1 :]
+                else:
+                    for email in emails:
+                        mark_failed(email, e, self.max_attempts)
+                    failed += len(emails)
+                    emails = []
+            else:
+                emails = []
+            mark_sent(attempted)
+            sent += len(attempted)
+
+        self.stats.sent += sent
+        self.stats.failed += failed
+        self.stats.batches += 1
+        self.stats.send_time += time.perf_counter() - started_at
+        return sent, failed
+
+
+def send_due_emails(batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+    """
+    Send up to `batch_size` due emails over one SMTP connection.
+    Returns (number sent, number failed).
+    """
+    with OutboxSender(batch_size, max_attempts) as sender:
+        return sender.send_due()
@@ -1,7 +1,31 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.core.cache import cache, caches
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import translation
+from django.utils import timezone
 from django.urls import reverse
 from django.contrib.auth import get_user_model, authenticate
 
+from lib.aho_corasick import AhoCorasick
+from lib import email_templates
+from lib.cache_versions import SHARED_CACHE_ALIAS
+from lib.rate_limit import get_client_ip, take_token, take_tokens
+
+from . import emails, outbox
+from .forms import CustomUserCreationForm
+from .models import OutboxEmail
+from . import utils
+from .utils import contains_profanity, normalize_text
+
 
 class CustomUserTests(TestCase):
     def setUp(self):
@@ -208,3 +232,403 @@ class CustomUserTests(TestCase):
         # Refresh from database and check
         self.user.refresh_from_db()
         self.assertTrue(self.user.is_email_verified)
+
+
+class ProfanityMatcherTests(TestCase):
+    def test_aho_corasick_finds_all_occurrences(self):
+        matcher = AhoCorasick(["he", "she", "his", "hers"])
+        self.assertEqual(
+            list(matcher.iter_matches("ushers")),
+            [(3, "she"), (3, "he"), (5, "hers")],
+        )
+        self.assertEqual(matcher.search("this"), "his")
+        self.assertIsNone(matcher.search("xyz"))
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("F_u-C.k"), "fuck")
+        self.assertEqual(normalize_text("$h1t"), "shit")
+        self.assertEqual(normalize_text("sh_1_t"), "shit")
+        self.assertEqual(normalize_text("Ana_Lena"), "ana lena")
+
+    def test_detects_plain_leetspeak_and_split_words(self):
+        for username in ["fuck", "Shit123", "Sh1t", "f_u_c_k", "b.i.t.c.h", "a$$hole"]:
+            with self.subTest(username=username):
+                self.assertTrue(contains_profanity(username))
+
+    def test_detects_split_multi_word_profanities(self):
+        for username in ["blow_job", "blowjob", "blow-j.o.b"]:
+            with self.subTest(username=username):
+                self.assertTrue(contains_profanity(username))
+
+    def test_accepts_clean_usernames(self):
+        for username in ["enzo", "Hans_Muster", "eggs", "l0ser99", "mechanik"]:
+            with self.subTest(username=username):
+                self.assertFalse(contains_profanity(username))
+
+    def test_separate_words_are_not_joined(self):
+        for username in ["ana_lena", "jan_ushka", "hope_nis", "lukas_hit", "Ana.Lena"]:
+            with self.subTest(username=username):
+                self.assertFalse(contains_profanity(username))
+
+    def test_signup_form_rejects_profane_username(self):
+        form = CustomUserCreationForm(
+            data={
+                "username": "sh_1_t",
+                "email": "someone@example.com",
+                "password1": "a-Long-password-42",
+                "password2": "a-Long-password-42",
+            }
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("username", form.errors)
+
+
+class CompiledProfanitiesTests(TestCase):
+    def setUp(self):
+        utils.get_profanity_matchers.cache_clear()
+        self.addCleanup(utils.get_profanity_matchers.cache_clear)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = Path(self.tmpdir.name) / "profanities.json"
+
+    def test_build_profanities_command(self):
+        out = StringIO()
+        call_command("build_profanities", output=self.path, stdout=out)
+        self.assertIn("Compiled", out.getvalue())
+
+        with mock.patch.object(utils, "COMPILED_PROFANITIES_FILE_PATH", self.path):
+            with mock.patch.object(utils, "read_profanities") as read_profanities:
+                self.assertTrue(contains_profanity("f_u_c_k"))
+                self.assertFalse(contains_profanity("enzo"))
+            # Loaded from the compiled file, the CSVs are not parsed
+            read_profanities.assert_not_called()
+
+    def test_falls_back_to_csvs_without_compiled_file(self):
+        with mock.patch.object(utils, "COMPILED_PROFANITIES_FILE_PATH", self.path):
+            with mock.patch.object(
+                utils, "read_profanities", wraps=utils.read_profanities
+            ) as read_profanities:
+                self.assertTrue(contains_profanity("Sh1t"))
+                self.assertTrue(contains_profanity("fuck"))
+            read_profanities.assert_called_once()
+
+    def test_compiled_matchers_behave_like_fresh_ones(self):
+        utils.compile_profanities(self.path)
+        with mock.patch.object(utils, "COMPILED_PROFANITIES_FILE_PATH", self.path):
+            raw, normalized = utils.get_profanity_matchers()
+        fresh_raw, fresh_normalized = utils.build_profanity_matchers(
+            utils.read_profanities()
+        )
+        for text in ["fuck", "asshole", "schwanz", "hello", "shit"]:
+            with self.subTest(text=text):
+                self.assertEqual(raw.search(text), fresh_raw.search(text))
+                self.assertEqual(normalized.search(text), fresh_normalized.search(text))
+
+
+class OutboxTests(TestCase):
+    def test_signup_queues_verification_email(self):
+        response = self.client.post(
+            reverse("accounts:signup"),
+            {
+                "username": "newuser",
+                "email": "new@example.com",
+                "password1": "a-Long-password-42",
+                "password2": "a-Long-password-42",
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        # Nothing is sent inside the request
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.recipients, ["new@example.com"])
+        self.assertEqual(email.status, OutboxEmail.Status.PENDING)
+        self.assertIn("/activate/", email.body)
+        self.assertTrue(email.html_body)
+
+    def test_password_reset_queues_email(self):
+        get_user_model().objects.create_user(
+            username="resetuser", email="reset@example.com", password="x-Pass-1234"
+        )
+        self.client.post(
+            reverse("accounts:password_reset"), {"email": "reset@example.com"}
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.get().recipients, ["reset@example.com"])
+
+    def test_send_outbox_sends_due_emails(self):
+        outbox.enqueue_email("Hello", "Text", ["a@example.com"], html_body="<p>Hi</p>")
+        later = outbox.enqueue_email("Later", "Text", ["b@example.com"])
+        later.next_attempt_at = timezone.now() + timedelta(hours=1)
+        later.save()
+
+        call_command("send_outbox", once=True, stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["a@example.com"])
+        self.assertEqual(mail.outbox[0].alternatives[0][0], "<p>Hi</p>")
+        sent = OutboxEmail.objects.get(subject="Hello")
+        self.assertEqual(sent.status, OutboxEmail.Status.SENT)
+        self.assertIsNotNone(sent.sent_at)
+        # The body may contain tokens, it isn't needed anymore
+        self.assertEqual((sent.body, sent.html_body), ("", ""))
+        self.assertEqual(
+            OutboxEmail.objects.get(subject="Later").status,
+            OutboxEmail.Status.PENDING,
+        )
+
+    def test_failed_email_is_retried_with_backoff(self):
+        email = outbox.enqueue_email("Hello", "Text", ["a@example.com"])
+        with (
+            mock.patch(
+                "django.core.mail.backends.locmem.EmailBackend.send_messages",
+                side_effect=OSError("connection refused"),
+            ),
+            self.assertLogs("nethz_django.outbox", "WARNING"),
+        ):
+            self.assertEqual(outbox.send_due_emails(max_attempts=2), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutboxEmail.Status.PENDING)
+            self.assertEqual(email.attempts, 1)
+            self.assertIn("connection refused", email.last_error)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+
+            # Not due yet
+            self.assertEqual(outbox.send_due_emails(max_attempts=2), (0, 0))
+
+            OutboxEmail.objects.update(next_attempt_at=timezone.now())
+            outbox.send_due_emails(max_attempts=2)
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutboxEmail.Status.FAILED)
+            self.assertEqual(email.attempts, 2)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_send_outbox_prunes_old_emails(self):
+        old_sent = outbox.enqueue_email("Old sent", "Text", ["a@example.com"])
+        old_failed = outbox.enqueue_email("Old failed", "Text", ["b@example.com"])
+        old_pending = outbox.enqueue_email("Old pending", "Text", ["c@example.com"])
+        recent = outbox.enqueue_email("Recent", "Text", ["d@example.com"])
+        OutboxEmail.objects.filter(pk__in=[old_sent.pk, recent.pk]).update(
+            status=OutboxEmail.Status.SENT
+        )
+        OutboxEmail.objects.filter(pk=old_failed.pk).update(
+            status=OutboxEmail.Status.FAILED
+        )
+        OutboxEmail.objects.exclude(pk=recent.pk).update(
+            created_at=timezone.now() - timedelta(days=8),
+            next_attempt_at=timezone.now() + timedelta(hours=1),
+        )
+
+        out = StringIO()
+        call_command("send_outbox", once=True, keep_days=7, stdout=out)
+
+        self.assertIn("Deleted 2 old emails", out.getvalue())
+        self.assertQuerySetEqual(
+            OutboxEmail.objects.order_by("pk"),
+            [old_pending, recent],
+        )
+
+    def test_retry_delay(self):
+        self.assertEqual(outbox.retry_delay(1), outbox.RETRY_BASE_DELAY)
+        self.assertEqual(outbox.retry_delay(2), 2 * outbox.RETRY_BASE_DELAY)
+        self.assertEqual(outbox.retry_delay(20), outbox.RETRY_MAX_DELAY)
+
+
+class OutboxSenderTests(TestCase):
+    def enqueue(self, count, prefix="user"):
+        for i in range(count):
+            outbox.enqueue_email("Hello", "Text", [f"{prefix}{i}@example.com"])
+
+    def test_sends_batches_over_one_connection(self):
+        self.enqueue(120)
+        with mock.patch.object(
+            locmem.EmailBackend,
+            "send_messages",
+            autospec=True,
+            side_effect=locmem.EmailBackend.send_messages,
+        ) as send_messages:
+            out = StringIO()
+            call_command("send_outbox", once=True, batch_size=50, stdout=out)
+
+        self.assertEqual(len(mail.outbox), 120)
+        self.assertEqual(send_messages.call_count, 3)
+        self.assertIn(
+            "sent 120, failed 0 in 3 batches over 1 connections", out.getvalue()
+        )
+        self.assertFalse(
+            OutboxEmail.objects.exclude(status=OutboxEmail.Status.SENT).exists()
+        )
+
+    def test_failing_message_does_not_fail_the_batch(self):
+        self.enqueue(2)
+        self.enqueue(1, prefix="bad")
+        self.enqueue(2, prefix="other")
+
+        def send_messages(backend, messages):
+            count = 0
+            for message in messages:
+                if message.to[0].startswith("bad"):
+                    raise OSError("recipient refused")
+                mail.outbox.append(message)
+                count += 1
+            return count
+
+        with (
+            mock.patch.object(
+                locmem.EmailBackend,
+                "send_messages",
+                autospec=True,
+                side_effect=send_messages,
+            ),
+            self.assertLogs("nethz_django.outbox", "WARNING"),
+            outbox.OutboxSender() as sender,
+        ):
+            self.assertEqual(sender.send_due(), (4, 1))
+
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(
+            OutboxEmail.objects.get(status=OutboxEmail.Status.PENDING).recipients,
+            ["bad0@example.com"],
+        )
+        self.assertEqual(
+            OutboxEmail.objects.filter(status="sent", attempts=1).count(), 4
+        )
+        # Reconnected after the failure
+        self.assertEqual(sender.stats.connections, 2)
+        self.assertEqual(sender.stats.batches, 1)
+
+    def test_connection_is_reused_across_batches(self):
+        with outbox.OutboxSender(batch_size=2) as sender:
+            self.enqueue(3)
+            self.assertEqual(sender.send_due(), (2, 0))
+            self.assertEqual(sender.send_due(), (1, 0))
+            self.assertEqual(sender.send_due(), (0, 0))
+        self.assertEqual(sender.stats.connections, 1)
+        self.assertEqual(sender.stats.sent, 3)
+        self.assertGreater(sender.stats.per_second, 0)
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        caches[SHARED_CACHE_ALIAS].clear()
+
+    def test_token_bucket(self):
+        with mock.patch("lib.rate_limit.time.time", return_value=1000.0) as now:
+            self.assertTrue(take_token("test", 2, 60))
+            self.assertTrue(take_token("test", 2, 60))
+            self.assertFalse(take_token("test", 2, 60))
+            # Other buckets are independent
+            self.assertTrue(take_token("other", 2, 60))
+
+            now.return_value = 1061.0
+            self.assertTrue(take_token("test", 2, 60))
+            self.assertFalse(take_token("test", 2, 60))
+
+    def test_take_tokens_takes_nothing_if_a_bucket_is_empty(self):
+        with mock.patch("lib.rate_limit.time.time", return_value=1000.0):
+            self.assertTrue(take_token("ip", 1, 60))
+            limits = [("user", 1, 60), ("ip", 1, 60)]
+            self.assertFalse(take_tokens(limits))
+            # The user's token wasn't used up by the refused attempt
+            self.assertTrue(take_token("user", 1, 60))
+
+    @override_settings(TRUST_X_FORWARDED_FOR=True)
+    def test_client_ip_behind_proxy(self):
+        request = RequestFactory().get(
+            "/", HTTP_X_FORWARDED_FOR="6.6.6.6, 1.2.3.4", REMOTE_ADDR="10.0.0.1"
+        )
+        self.assertEqual(get_client_ip(request), "1.2.3.4")
+
+    @override_settings(TRUST_X_FORWARDED_FOR=False)
+    def test_client_ip_without_proxy(self):
+        request = RequestFactory().get(
+            "/", HTTP_X_FORWARDED_FOR="6.6.6.6", REMOTE_ADDR="10.0.0.1"
+        )
+        self.assertEqual(get_client_ip(request), "10.0.0.1")
+
+
+class VerificationEmailResendTests(TestCase):
+    def setUp(self):
+        caches[SHARED_CACHE_ALIAS].clear()
+        self.user = get_user_model().objects.create_user(
+            username="unverified",
+            email="unverified@example.com",
+            password="x-Pass-1234",
+        )
+
+    def login(self):
+        return self.client.post(
+            reverse("accounts:login"),
+            {"username": "unverified@example.com", "password": "x-Pass-1234"},
+        )
+
+    def test_pending_verification_email_is_not_queued_again(self):
+        for _ in range(5):
+            self.assertRedirects(self.login(), reverse("accounts:login"))
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_resends_are_rate_limited_per_user(self):
+        for _ in range(6):
+            self.login()
+            # As if the worker sent it right away
+            OutboxEmail.objects.update(status=OutboxEmail.Status.SENT)
+        capacity, _refill_time = emails.VERIFICATION_EMAIL_USER_LIMIT
+        self.assertEqual(OutboxEmail.objects.count(), capacity)
+
+    def test_identical_pending_emails_are_deduplicated(self):
+        first = outbox.enqueue_email("Hello", "Text", ["a@example.com"])
+        self.assertEqual(
+            outbox.enqueue_email("Hello", "Text", ["a@example.com"]), first
+        )
+        self.assertNotEqual(
+            outbox.enqueue_email("Hello", "Other", ["a@example.com"]), first
+        )
+
+        OutboxEmail.objects.update(status=OutboxEmail.Status.SENT)
+        self.assertNotEqual(
+            outbox.enqueue_email("Hello", "Text", ["a@example.com"]), first
+        )
+
+
+class EmailTemplateTests(TestCase):
+    values = {
+        "username": "o'brien&co",
+        "domain": "example.com",
+        "uid": "MTI",
+        "token": "abc-123",
+    }
+
+    def setUp(self):
+        cache.clear()
+        translation.activate("en")
+        self.addCleanup(translation.deactivate)
+
+    def test_renders_like_the_templates(self):
+        subject, txt, html = emails.VERIFICATION_EMAIL.render(**self.values)
+        self.assertEqual(subject, "Activate your account")
+        self.assertEqual(
+            txt, render_to_string("accounts/verification_email.txt", self.values)
+        )
+        self.assertEqual(
+            html, render_to_string("accounts/verification_email.html", self.values)
+        )
+        self.assertIn("o&#x27;brien&amp;co", html)
+        self.assertIn("http://example.com/en/accounts/activate/MTI/abc-123/", txt)
+
+    def test_templates_are_rendered_once_per_language(self):
+        with mock.patch.object(
+            email_templates, "get_template", wraps=email_templates.get_template
+        ) as get_template:
+            for username in ["alice", "bob", "carol"]:
+                emails.VERIFICATION_EMAIL.render(
+                    **{**self.values, "username": username}
+                )
+            self.assertEqual(get_template.call_count, 2)
+
+            with translation.override("de"):
+                _subject, txt, _html = emails.VERIFICATION_EMAIL.render(**self.values)
+            self.assertEqual(get_template.call_count, 4)
+            self.assertIn("/de/accounts/activate/", txt)
+
+    def test_missing_field(self):
+        with self.assertRaises(ValueError):
+            emails.VERIFICATION_EMAIL.render(username="bob")
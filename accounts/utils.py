@@ -1,27 +1,147 @@
 import csv
+import itertools
+import json
+import re
+import unicodedata
+from functools import lru_cache
 from pathlib import Path
 
+from lib.aho_corasick import AhoCorasick
 
-FILE_PATH = Path(__file__).resolve().parent
 
-PROFANITY_EN_CSV_FILE_PATH = FILE_PATH / "profanity" / "profanity_en.csv"
-PROFANITY_DE_CSV_FILE_PATH = FILE_PATH / "profanity" / "profanity_de.csv"
+PROFANITY_DIR = Path(__file__).resolve().parent / "profanity"
 
-with open(PROFANITY_EN_CSV_FILE_PATH, "r", encoding="utf-8") as f:
-    READER = csv.DictReader(f)
-    EN_CSV_ENTRIES = list(READER)
+PROFANITY_CSV_FILE_PATHS = (
+    PROFANITY_DIR / "profanity_en.csv",
+    PROFANITY_DIR / "profanity_de.csv",
+)
+# Written by `manage.py build_profanities`
+COMPILED_PROFANITIES_FILE_PATH = PROFANITY_DIR / "profanities.json"
 
-with open(PROFANITY_DE_CSV_FILE_PATH, "r", encoding="utf-8") as f:
-    READER = csv.DictReader(f)
-    DE_CSV_ENTRIES = list(READER)
 
+def read_profanities():
+    """The lowercased profanities (and their canonical forms) of the CSVs."""
+    profanities = set()
+    for path in PROFANITY_CSV_FILE_PATHS:
+        with open(path, "r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                profanities.add(row["text"].lower())
+                profanities.add(row["canonical_form_1"].lower())
+    return profanities
 
-PROFANITIES = set()
-for row in EN_CSV_ENTRIES:
-    PROFANITIES.add(row["text"].lower())
-    PROFANITIES.add(row["canonical_form_1"].lower())
 
+# Leetspeak digits/symbols and the letters they stand for
+LEET_TABLE = str.maketrans(
+    {
+        "0": "o",
+        "1": "i",
+        "3": "e",
+        "4": "a",
+        "5": "s",
+        "7": "t",
+        "8": "b",
+        "9": "g",
+        "@": "a",
+        "$": "s",
+        "!": "i",
+        "+": "t",
+        "|": "l",
+    }
+)
+# Characters used to split words up: "f.u.c.k", "f_u_c_k", "f u c k"
+SEPARATORS_RE = re.compile(r"[\s\-_.*'/\\]+")
 
-for row in DE_CSV_ENTRIES:
-    PROFANITIES.add(row["text"].lower())
-    PROFANITIES.add(row["canonical_form_1"].lower())
+
+def normalize_text(text):
+    """
+    Lowercase, undo leetspeak and normalize separators: "F_u-C.k" -> "fuck".
+
+    Separators next to a single character are dropped (a word split up
+    letter by letter, "sh_1_t"); between longer parts they become one space,
+    so separate words aren't joined ("ana_lena" must not contain "anal").
+    """
+    text = unicodedata.normalize("NFKC", text).lower().translate(LEET_TABLE)
+    parts = [part for part in SEPARATORS_RE.split(text) if part]
+    if not parts:
+        return ""
+    normalized = [parts[0]]
+    for previous, part in itertools.pairwise(parts):
+        if len(previous) > 1 and len(part) > 1:
+            normalized.append(" ")
+        normalized.append(part)
+    return "".join(normalized)
+
+
+def build_profanity_matchers(profanities):
+    """
+    Return (raw, normalized) automatons: the raw entries, matched against the
+    lowercased text, and the entries made of words only, matched against the
+    normalized text. Multi-word entries are added with single spaces between
+    the words ("blow_job") and without ("blowjob"). Entries with digits or
+    symbols ("69", "c*nt") stay raw-only, their normalized form would match
+    harmless words.
+    """
+    words = set()
+    for entry in profanities:
+        compact = re.sub(r"[\s\-]+", "", entry)
+        if compact.isalpha():
+            words.add(compact)
+            words.add(" ".join(re.split(r"[\s\-]+", entry.strip())))
+    return AhoCorasick(profanities), AhoCorasick(words)
+
+
+def compile_profanities(path=COMPILED_PROFANITIES_FILE_PATH):
+    """
+    Build the matchers from the CSVs and write their tables to `path`.
+    Returns the number of profanities.
+    """
+    profanities = read_profanities()
+    raw, normalized = build_profanity_matchers(profanities)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"raw": raw.to_data(), "normalized": normalized.to_data()},
+            f,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+    return len(profanities)
+
+
+def is_compiled_up_to_date(path):
+    try:
+        compiled_at = path.stat().st_mtime
+    except OSError:
+        return False
+    return all(
+        csv_path.stat().st_mtime <= compiled_at for csv_path in PROFANITY_CSV_FILE_PATHS
+    )
+
+
+@lru_cache(maxsize=1)
+def get_profanity_matchers():
+    """
+    (raw, normalized) matchers, loaded on first use: from the file written
+    by `manage.py build_profanities`, or built from the CSVs if it is
+    missing or older than them.
+    """
+    path = COMPILED_PROFANITIES_FILE_PATH
+    if is_compiled_up_to_date(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return (
+                AhoCorasick.from_data(data["raw"]),
+                AhoCorasick.from_data(data["normalized"]),
+            )
+        except (OSError, ValueError, KeyError):
+            pass
+    return build_profanity_matchers(read_profanities())
+
+
+def contains_profanity(text):
+    """Whether `text` contains a profanity, also in leetspeak or split up."""
+    raw, normalized = get_profanity_matchers()
+    return (
+        raw.search(text.lower()) is not None
+        or normalized.search(normalize_text(text)) is not None
+    )
@@ -29,7 +29,7 @@ from .forms import (
     CustomSetPasswordForm,
 )
 from .models import CustomUser
-from .emails import send_verification_email
+from .emails import can_resend_verification_email, send_verification_email
 
 UserModel = get_user_model()
 
@@ -84,14 +84,23 @@ class CustomLoginView(LoginView):
             messages.success(self.request, _("You successfully logged in."))
             return redirect(self.success_url)
 
-        messages.warning(
-            self.request,
-            _(
-                "Another confirmation email has been sent to your email address since you have not confirmed it yet."
-            ),
-        )
-        # Resend activation email
-        send_verification_email(user, self.request)
+        # Resend the activation email, unless one was sent just now: repeated
+        # logins only cost a cache lookup
+        if can_resend_verification_email(user, self.request):
+            send_verification_email(user, self.request)
+            messages.warning(
+                self.request,
+                _(
+                    "Another confirmation email has been sent to your email address since you have not confirmed it yet."
+                ),
+            )
+        else:
+            messages.warning(
+                self.request,
+                _(
+                    "A confirmation email has already been sent to your email address recently. Please check your inbox and your spam folder."
+                ),
+            )
         return redirect("accounts:login")
 
 
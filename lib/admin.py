@@ -0,0 +1,26 @@
+from lib.cache_versions import deferred_invalidation, invalidate_model
+
+
+class CacheInvalidationAdminMixin:
+    """
+    ModelAdmin mixin for models registered with `register_cache_tags`.
+
+    Saving a form with inlines or a changelist with `list_editable` fires one
+    signal per row; those bumps are applied once per request. Bulk actions
+    may bypass model signals (`queryset.update()`), so the model's tags are
+    always bumped after an action.
+    """
+
+    def changeform_view(self, request, *args, **kwargs):
+        with deferred_invalidation():
+            return super().changeform_view(request, *args, **kwargs)
+
+    def changelist_view(self, request, extra_context=None):
+        with deferred_invalidation():
+            return super().changelist_view(request, extra_context)
+
+    def response_action(self, request, queryset):
+        with deferred_invalidation():
+            response = super().response_action(request, queryset)
+            invalidate_model(self.model)
+        return response
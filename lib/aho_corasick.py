@@ -0,0 +1,84 @@
+"""
+Aho–Corasick automaton for matching many patterns at once.
+
+Building costs O(total pattern length); a search then walks the text once,
+independent of the number of patterns, instead of one substring scan per
+pattern.
+"""
+
+from collections import deque
+
+
+class AhoCorasick:
+    def __init__(self, patterns):
+        # Per node: transitions, failure link, pattern ending here and the
+        # next node on the failure chain where a pattern ends
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]
+        self.output_link = [0]
+
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._build_links()
+
+    def to_data(self):
+        """The compiled tables as JSON-serializable lists."""
+        return [self.goto, self.fail, self.output, self.output_link]
+
+    @classmethod
+    def from_data(cls, data):
+        """Rebuild an automaton from `to_data()` without compiling it again."""
+        automaton = cls.__new__(cls)
+        automaton.goto, automaton.fail, automaton.output, automaton.output_link = data
+        return automaton
+
+    def _add(self, pattern):
+        node = 0
+        for char in pattern:
+            child = self.goto[node].get(char)
+            if child is None:
+                child = len(self.goto)
+                self.goto[node][char] = child
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+                self.output_link.append(0)
+            node = child
+        self.output[node] = pattern
+
+    def _build_links(self):
+        # Breadth first, so the failure targets (shorter suffixes) are done
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.output_link[child] = (
+                    target
+                    if self.output[target] is not None
+                    else self.output_link[target]
+                )
+
+    def iter_matches(self, text):
+        """Yield (end index, pattern) for every occurrence in `text`."""
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+
+            match = node if self.output[node] is not None else self.output_link[node]
+            while match:
+                yield index, self.output[match]
+                match = self.output_link[match]
+
+    def search(self, text):
+        """First pattern found in `text`, None if there is none."""
+        return next((pattern for _index, pattern in self.iter_matches(text)), None)
@@ -0,0 +1,56 @@
+"""
+Version and build time of the deployed code.
+
+The build time is recorded when the Docker image is built (`BUILD_TIME`
+file written by the Dockerfile, or the `BUILD_TIME` environment variable,
+both in Unix seconds). Without either, e.g. in development, the start of
+the process is used, so every restart counts as a new deploy.
+"""
+
+import os
+import tomllib
+from datetime import UTC, datetime
+from functools import lru_cache
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+BUILD_TIME_FILE = BASE_DIR / "BUILD_TIME"
+
+PROCESS_STARTED_AT = datetime.now(UTC)
+
+
+@lru_cache(maxsize=1)
+def get_version():
+    """Get version from pyproject.toml, cached for performance."""
+    try:
+        pyproject_path = BASE_DIR / "pyproject.toml"
+        with open(pyproject_path, "rb") as f:
+            data = tomllib.load(f)
+        return data.get("project", {}).get("version", "unknown")
+    except Exception:
+        return "unknown"
+
+
+def read_build_time():
+    """Recorded build time, or None if there is none (or it is invalid)."""
+    value = os.environ.get("BUILD_TIME")
+    if not value:
+        try:
+            value = BUILD_TIME_FILE.read_text()
+        except OSError:
+            return None
+    try:
+        return datetime.fromtimestamp(int(value.strip()), tz=UTC)
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_build_time():
+    """Timestamp of the deployed build, used as lastmod of static pages."""
+    return read_build_time() or PROCESS_STARTED_AT
+
+
+def get_deploy_version():
+    """Changes with every deploy (version + build time of the image)."""
+    return f"{get_version()}-{get_build_time().timestamp():.0f}"
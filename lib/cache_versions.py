@@ -0,0 +1,106 @@
+"""
+Version counters for cache invalidation.
+
+Cached content is keyed on a version token instead of being deleted: bumping
+the token makes every key built from the old one unreachable. Tokens live in
+the "shared" cache so all gunicorn workers see a bump, while the (large)
+cached content itself can stay in the fast per-process default cache.
+
+Models are mapped to the tags of the content built from them with
+`register_cache_tags`; saving or deleting an instance then bumps those tags.
+Bulk changes that send no signals (`update()`, `bulk_create()`, ...) call
+`invalidate_model`, and `deferred_invalidation` bumps every tag only once
+for a batch of changes (admin actions, imports). Bumps are applied once the
+surrounding transaction commits.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import partial
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+SHARED_CACHE_ALIAS = "shared"
+
+_model_tags = defaultdict(set)
+_deferred = threading.local()
+
+
+def _version_key(tag):
+    return f"cache_version:{tag}"
+
+
+def _new_token():
+    # Time-based tokens never repeat, even if the shared entry is evicted
+    return str(time.time_ns())
+
+
+def get_cache_version(tag):
+    """Current version token for `tag`."""
+    return caches[SHARED_CACHE_ALIAS].get_or_set(
+        _version_key(tag), _new_token, timeout=None
+    )
+
+
+def _set_new_version(tag):
+    caches[SHARED_CACHE_ALIAS].set(_version_key(tag), _new_token(), timeout=None)
+
+
+def bump_cache_version(tag):
+    """
+    Invalidate everything cached under `tag`, once the current transaction
+    commits (right away outside of one). Bumping earlier would let a
+    concurrent request re-cache the old rows under the new version.
+    """
+    pending = getattr(_deferred, "tags", None)
+    if pending is not None:
+        pending.add(tag)
+        return
+    transaction.on_commit(partial(_set_new_version, tag))
+
+
+@contextmanager
+def deferred_invalidation():
+    """Collect the bumps of the block and apply each tag once at the end."""
+    if getattr(_deferred, "tags", None) is not None:
+        # Nested: the outermost block applies the bumps
+        yield
+        return
+
+    _deferred.tags = set()
+    try:
+        yield
+    finally:
+        tags, _deferred.tags = _deferred.tags, None
+        for tag in tags:
+            bump_cache_version(tag)
+
+
+def register_cache_tags(model, *tags):
+    """Bump `tags` whenever an instance of `model` is saved or deleted."""
+    _model_tags[model].update(tags)
+    label = model._meta.label
+    post_save.connect(
+        _invalidate_sender, sender=model, dispatch_uid=f"cache_tags:save:{label}"
+    )
+    post_delete.connect(
+        _invalidate_sender, sender=model, dispatch_uid=f"cache_tags:delete:{label}"
+    )
+
+
+def get_model_cache_tags(model):
+    return frozenset(_model_tags.get(model, ()))
+
+
+def invalidate_model(model):
+    """Bump all tags of `model`, for bulk changes that send no signals."""
+    for tag in get_model_cache_tags(model):
+        bump_cache_version(tag)
+
+
+def _invalidate_sender(sender, **kwargs):
+    invalidate_model(sender)
@@ -0,0 +1,111 @@
+"""
+Precompressed response bodies for small, hot, rarely changing responses
+(sitemap.xml, robots.txt, ...).
+
+zstd comes from the stdlib `compression.zstd` on Python >= 3.14 and from the
+`zstandard` package before; it is only used for the precompressed static files
+(see `nethz_django.storage`).
+"""
+
+import gzip
+import hashlib
+
+import brotli
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+try:
+    from compression import zstd  # Python >= 3.14
+except ImportError:
+    import zstandard as zstd
+
+
+# Preferred encodings, best first
+ENCODINGS = ("br", "gzip")
+
+# Highest level without zstd's "ultra" modes: those raise the window size
+# beyond the 8 MB browsers are required to support
+ZSTD_LEVEL = 19
+
+
+def compress_gzip(content: bytes) -> bytes:
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def compress_brotli(content: bytes) -> bytes:
+    """brotli at max quality."""
+    return brotli.compress(content, quality=11)
+
+
+def compress_zstd(content: bytes) -> bytes:
+    """zstd at `ZSTD_LEVEL`."""
+    return zstd.compress(content, level=ZSTD_LEVEL)
+
+
+def compress_variants(content: bytes) -> dict:
+    """Return `content` keyed by content coding, compressed at max level."""
+    return {
+        "identity": content,
+        # mtime=0 keeps the output (and therefore the ETag) deterministic
+        "gzip": compress_gzip(content),
+        "br": compress_brotli(content),
+    }
+
+
+def build_precompressed(
+    content: bytes, content_type: str, headers=None, last_modified=None
+):
+    """
+    Build a cacheable entry holding all encodings of `content`.
+
+    The entry is a plain dict so it can be stored in any cache backend.
+    """
+    return {
+        "variants": compress_variants(content),
+        "content_type": content_type,
+        "etag": f'"{hashlib.sha256(content).hexdigest()[:32]}"',
+        "last_modified": last_modified,
+        "headers": dict(headers or {}),
+    }
+
+
+def choose_encoding(request, available) -> str:
+    """Pick the best encoding from `available` that the client accepts."""
+    accepted = set()
+    for token in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _sep, params = token.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+
+    for encoding in ENCODINGS:
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return "identity"
+
+
+def serve_precompressed(request, entry, max_age=3600):
+    """Serve a `build_precompressed` entry with ETag and content negotiation."""
+    encoding = choose_encoding(request, entry["variants"])
+
+    response = HttpResponse(
+        entry["variants"][encoding], content_type=entry["content_type"]
+    )
+    for header, value in entry["headers"].items():
+        response[header] = value
+    if encoding != "identity":
+        response["Content-Encoding"] = encoding
+    # Same representation in every encoding, so a weak validator is correct
+    response["ETag"] = f"W/{entry['etag']}"
+    if entry["last_modified"] is not None:
+        response["Last-Modified"] = http_date(entry["last_modified"])
+    response["Cache-Control"] = f"public, max-age={max_age}"
+    patch_vary_headers(response, ("Accept-Encoding",))
+
+    return get_conditional_response(
+        request,
+        etag=response["ETag"],
+        last_modified=entry["last_modified"],
+        response=response,
+    )
@@ -0,0 +1,28 @@
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.views.decorators.http import last_modified
+
+
+def anonymous_last_modified(last_modified_func):
+    """
+    Like Django's `last_modified`, but only for anonymous visitors.
+
+    For anonymous visitors (crawlers) without pending messages the page only
+    depends on the data, so an `If-Modified-Since` request can be answered with
+    a 304 before anything is rendered. Logged in users get the normal view,
+    since their navbar/messages are not covered by the timestamp.
+    """
+
+    def decorator(view):
+        conditional_view = last_modified(last_modified_func)(view)
+
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.user.is_authenticated or len(get_messages(request)):
+                return view(request, *args, **kwargs)
+            return conditional_view(request, *args, **kwargs)
+
+        return inner
+
+    return decorator
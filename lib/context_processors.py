@@ -1,22 +1,10 @@
-import tomllib
 from datetime import datetime, timezone
-from pathlib import Path
-from functools import lru_cache
 
 from django.conf import settings
 from django.urls import reverse
 
-
-@lru_cache(maxsize=1)
-def get_version():
-    """Get version from pyproject.toml, cached for performance."""
-    try:
-        pyproject_path = Path(__file__).resolve().parent.parent / "pyproject.toml"
-        with open(pyproject_path, "rb") as f:
-            data = tomllib.load(f)
-        return data.get("project", {}).get("version", "unknown")
-    except Exception:
-        return "unknown"
+from lib import seo_utils
+from lib.build_info import get_version
 
 
 def get_absolute_url(request, url_name, *args, **kwargs):
@@ -29,26 +17,8 @@ def get_absolute_url(request, url_name, *args, **kwargs):
 
 
 def get_hreflang_urls(request, url_name, *args, **kwargs):
-    """Generate hreflang URLs for all languages."""
-    scheme = "https" if request.is_secure() else "http"
-    host = request.get_host()
-    hreflang_urls = {}
-
-    from django.utils import translation
-
-    # Save current language
-    current_lang = translation.get_language()
-
-    try:
-        for lang_code, _lang_name in getattr(settings, "LANGUAGES", ()):
-            with translation.override(lang_code):
-                path = reverse(url_name, args=args, kwargs=kwargs)
-                hreflang_urls[lang_code] = f"{scheme}://{host}{path}"
-    finally:
-        # Restore original language
-        translation.activate(current_lang)
-
-    return hreflang_urls
+    """Generate hreflang URLs for all languages (memoized in seo_utils)."""
+    return seo_utils.get_hreflang_urls(request, url_name, args, kwargs)
 
 
 def inject_global_context(request):
@@ -0,0 +1,67 @@
+"""
+Rendering of transactional emails.
+
+The text and HTML variants of an email only differ between recipients in a
+few values (username, link, ...). `EmailTemplate` renders both variants
+together once per language with placeholders for those values and caches
+the result; sending an email then only fills in the values by string
+replacement instead of rendering two templates.
+"""
+
+import re
+
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.html import conditional_escape
+from django.utils.translation import get_language
+
+from lib.build_info import get_deploy_version
+
+PLACEHOLDER = "__email_{}__"
+PLACEHOLDER_RE = re.compile(r"__email_(\w+?)__")
+
+
+class EmailTemplate:
+    """
+    A text/HTML email. `fields` are the context variables that differ
+    between emails; the templates may only use them as plain values (no
+    filters or attribute lookups). Values are HTML-escaped like template
+    variables; values used in `{% url %}` must be URL-safe (uid, token).
+    """
+
+    def __init__(self, subject, txt_template_name, html_template_name, fields):
+        self.subject = subject
+        self.template_names = (txt_template_name, html_template_name)
+        self.fields = tuple(fields)
+
+    def get_skeletons(self):
+        """(text, HTML) with placeholders, rendered once per language."""
+        cache_key = (
+            f"email:{get_deploy_version()}:{get_language()}:"
+            f"{':'.join(self.template_names)}"
+        )
+        skeletons = cache.get(cache_key)
+        if skeletons is None:
+            context = {field: PLACEHOLDER.format(field) for field in self.fields}
+            skeletons = tuple(
+                get_template(name).render(context) for name in self.template_names
+            )
+            cache.set(cache_key, skeletons, timeout=None)
+        return skeletons
+
+    def render(self, **values):
+        """Return (subject, text body, HTML body) for `values`."""
+        missing = set(self.fields) - set(values)
+        if missing:
+            raise ValueError(f"Missing email fields: {', '.join(sorted(missing))}")
+        escaped = {name: conditional_escape(value) for name, value in values.items()}
+
+        def fill(match):
+            return escaped[match.group(1)]
+
+        txt, html = self.get_skeletons()
+        return (
+            str(self.subject),
+            PLACEHOLDER_RE.sub(fill, txt),
+            PLACEHOLDER_RE.sub(fill, html),
+        )
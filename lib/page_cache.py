@@ -0,0 +1,99 @@
+"""
+Full-page cache for anonymous visitors.
+
+Pages like the landing pages only depend on the language, the scheme and
+host (canonical and hreflang URLs) and the data for anonymous visitors, so their HTML is rendered once and served from
+the per-process cache afterwards. Logged in users and requests with pending
+messages always get a fresh render, since the navbar/messages differ.
+
+The CSRF token of the language switcher form is replaced on every hit, so
+each visitor still gets a token matching their own CSRF cookie.
+"""
+
+import re
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_vary_headers
+from django.utils.translation import get_language
+
+from lib.build_info import get_deploy_version
+from lib.cache_versions import get_cache_version
+
+PAGE_CACHE_TIMEOUT = 3600  # 1 hour
+
+CSRF_TOKEN_PLACEHOLDER = b"__csrf_token__"
+CSRF_INPUT_RE = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+
+def is_cacheable_request(request):
+    """Anonymous GET/HEAD without query string and without pending messages."""
+    return (
+        request.method in ("GET", "HEAD")
+        and not request.GET
+        and not request.user.is_authenticated
+        and not len(get_messages(request))
+    )
+
+
+def page_cache_key(request, tag=None):
+    version = get_deploy_version()
+    if tag is not None:
+        version += f":{get_cache_version(tag)}"
+    return (
+        f"page:{version}:{get_language()}:{request.scheme}:{request.get_host()}:"
+        f"{request.path}"
+    )
+
+
+def anonymous_page_cache(tag=None, timeout=PAGE_CACHE_TIMEOUT):
+    """
+    Cache the rendered page for anonymous visitors.
+
+    Static pages change with a deploy only. Pages showing database content
+    pass the `tag` whose version is bumped when that content changes (see
+    `lib.cache_versions`).
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if not is_cacheable_request(request):
+                return view(request, *args, **kwargs)
+
+            cache_key = page_cache_key(request, tag)
+            entry = cache.get(cache_key)
+            if entry is None:
+                response = view(request, *args, **kwargs)
+                # Only plain 200 pages; views setting cookies are per visitor
+                if (
+                    response.status_code != 200
+                    or response.streaming
+                    or response.cookies
+                ):
+                    return response
+                entry = {
+                    "content": CSRF_INPUT_RE.sub(
+                        rb"\1" + CSRF_TOKEN_PLACEHOLDER + rb"\2", response.content
+                    ),
+                    "content_type": response["Content-Type"],
+                }
+                cache.set(cache_key, entry, timeout)
+
+            response = HttpResponse(
+                entry["content"].replace(
+                    CSRF_TOKEN_PLACEHOLDER, get_token(request).encode()
+                ),
+                content_type=entry["content_type"],
+            )
+            # The language also comes from the cookie, the absolute URLs
+            # (canonical, hreflang) from the host
+            patch_vary_headers(response, ("Cookie", "Host"))
+            return response
+
+        return inner
+
+    return decorator
@@ -0,0 +1,66 @@
+"""
+Token-bucket rate limiting in the shared cache.
+
+A bucket holds up to `capacity` tokens and regains one every `refill_time`
+seconds; every allowed action takes a token. Buckets live in the "shared"
+cache so all gunicorn workers count together. Reading and writing a bucket
+is not atomic, so concurrent requests may occasionally get one token too
+many; that is fine for throttling, not for hard quotas.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from lib.cache_versions import SHARED_CACHE_ALIAS
+
+
+def get_client_ip(request):
+    """
+    The client's IP. Behind the reverse proxy (`TRUST_X_FORWARDED_FOR`),
+    the last X-Forwarded-For entry, the one the proxy appended.
+    """
+    if getattr(settings, "TRUST_X_FORWARDED_FOR", False):
+        forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if forwarded_for:
+            return forwarded_for.rsplit(",", 1)[-1].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def take_token(key, capacity, refill_time):
+    """
+    Take a token from the bucket `key`. Returns False (and takes nothing)
+    if the bucket is empty.
+    """
+    return take_tokens([(key, capacity, refill_time)])
+
+
+def take_tokens(limits):
+    """
+    Take a token from each (key, capacity, refill_time) bucket in `limits`
+    if all of them have one. Returns False (and takes nothing) if any bucket
+    is empty.
+    """
+    cache = caches[SHARED_CACHE_ALIAS]
+    now = time.time()
+    buckets = {
+        f"rate_limit:{key}": (capacity, refill_time)
+        for key, capacity, refill_time in limits
+    }
+    stored = cache.get_many(buckets)
+
+    # Check every bucket before taking from any of them
+    updates = []
+    for cache_key, (capacity, refill_time) in buckets.items():
+        tokens, updated_at = stored.get(cache_key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) / refill_time)
+        if tokens < 1:
+            return False
+        # Expires once the bucket would be full again anyway
+        timeout = int((capacity - tokens + 1) * refill_time) + 1
+        updates.append((cache_key, (tokens - 1, now), timeout))
+
+    for cache_key, bucket, timeout in updates:
+        cache.set(cache_key, bucket, timeout)
+    return True
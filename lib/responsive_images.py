@@ -0,0 +1,52 @@
+"""
+Width-bucketed variants of the card images, for `srcset`/`sizes`.
+
+The variants are built by `manage.py build_image_variants` and committed to
+`static/images/variants/` together with a manifest; images without variants
+simply get no `srcset`.
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from django.templatetags.static import static
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+VARIANTS_DIR = STATIC_DIR / "images" / "variants"
+MANIFEST_NAME = "manifest.json"
+
+# Width buckets in pixels; 1280 covers the widest card on 2x screens
+VARIANT_WIDTHS = (320, 480, 640, 960, 1280)
+
+# Rendered width of a card (`col-md-6` in a Bootstrap container) per breakpoint
+CARD_SIZES = (
+    "(min-width: 1400px) 636px, (min-width: 1200px) 546px, "
+    "(min-width: 992px) 456px, (min-width: 768px) 336px, calc(100vw - 24px)"
+)
+
+
+@lru_cache(maxsize=1)
+def load_variant_manifest():
+    """{static path: {"width": original width, "variants": {width: path}}}"""
+    try:
+        with open(VARIANTS_DIR / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@lru_cache(maxsize=64)
+def get_srcset(path):
+    """`srcset` for the static file `path`, "" if it has no variants."""
+    entry = load_variant_manifest().get(path)
+    if not entry or not entry["variants"]:
+        return ""
+    candidates = [
+        f"{static(variant)} {width}w"
+        for width, variant in sorted(
+            entry["variants"].items(), key=lambda item: int(item[0])
+        )
+    ]
+    candidates.append(f"{static(path)} {entry['width']}w")
+    return ", ".join(candidates)
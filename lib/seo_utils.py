@@ -2,18 +2,23 @@
 Simple SEO utility functions for basic meta tag management.
 """
 
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+
 from django.conf import settings
+from django.urls import reverse
+from django.utils import translation
 from django.utils.translation import gettext as _
 
 
+@dataclass(frozen=True, slots=True)
 class SEOData:
-    """Container for basic SEO meta data"""
+    """Container for basic SEO meta data (immutable, shared between requests)"""
 
-    def __init__(self, title=None, description=None, keywords=None, canonical_url=None):
-        self.title = title
-        self.description = description
-        self.keywords = keywords
-        self.canonical_url = canonical_url
+    title: str | None = None
+    description: str | None = None
+    keywords: str | None = None
+    canonical_url: str | None = None
 
     def to_context(self):
         """Convert to dictionary for template context"""
@@ -25,6 +30,33 @@ class SEOData:
         }
 
 
+# Upper bound for memoized SEOData objects per helper. The real key space is
+# small (pages x regions/semesters x languages).
+SEO_CACHE_SIZE = 128
+
+
+def memoize_per_language(func):
+    """
+    Memoize an SEO helper per active language.
+
+    The helpers only depend on their arguments and the active language, so
+    every page/region/language combination is built (and translated) once.
+    """
+
+    @lru_cache(maxsize=SEO_CACHE_SIZE)
+    def cached(language, *args):
+        return func(*args)
+
+    @wraps(func)
+    def wrapper(*args):
+        return cached(translation.get_language(), *args)
+
+    wrapper.cache_clear = cached.cache_clear
+    wrapper.cache_info = cached.cache_info
+    return wrapper
+
+
+@memoize_per_language
 def get_home_seo():
     """SEO data for the home page"""
     return SEOData(
@@ -38,6 +70,7 @@ def get_home_seo():
     )
 
 
+@memoize_per_language
 def get_technische_mechanik_seo(semester=None):
     """SEO data for Technische Mechanik pages"""
     if semester:
@@ -56,6 +89,7 @@ def get_technische_mechanik_seo(semester=None):
     return SEOData(title=title, description=description, keywords=keywords)
 
 
+@memoize_per_language
 def get_worldle_home_seo():
     """SEO data for Worldle home page"""
     return SEOData(
@@ -67,6 +101,7 @@ def get_worldle_home_seo():
     )
 
 
+@memoize_per_language
 def get_worldle_capitals_seo(region=None):
     """SEO data for Worldle capitals pages"""
     if region:
@@ -82,6 +117,7 @@ def get_worldle_capitals_seo(region=None):
     return SEOData(title=title, description=description, keywords=keywords)
 
 
+@memoize_per_language
 def get_worldle_languages_seo(region=None):
     """SEO data for Worldle languages pages"""
     if region:
@@ -97,6 +133,7 @@ def get_worldle_languages_seo(region=None):
     return SEOData(title=title, description=description, keywords=keywords)
 
 
+@memoize_per_language
 def get_worldle_competitive_seo(game_type):
     """SEO data for competitive Worldle games"""
     return SEOData(
@@ -106,6 +143,7 @@ def get_worldle_competitive_seo(game_type):
     )
 
 
+@memoize_per_language
 def get_leaderboards_seo():
     """SEO data for leaderboards page"""
     return SEOData(
@@ -115,6 +153,40 @@ def get_leaderboards_seo():
     )
 
 
+# Upper bound for memoized canonical/hreflang URL sets. Keys include the
+# request host, so the cache must stay bounded.
+HREFLANG_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=HREFLANG_CACHE_SIZE)
+def _cached_hreflang_urls(url_name, url_args, url_kwargs, scheme, host):
+    """Reverse `url_name` once per language, memoized per URL and host."""
+    args = list(url_args)
+    kwargs = dict(url_kwargs)
+    hreflang_urls = []
+    for lang_code, _lang_name in getattr(settings, "LANGUAGES", ()):
+        # override() restores the previously active language on exit
+        with translation.override(lang_code):
+            path = reverse(url_name, args=args, kwargs=kwargs)
+        hreflang_urls.append((lang_code, f"{scheme}://{host}{path}"))
+    return tuple(hreflang_urls)
+
+
+def get_hreflang_urls(request, url_name, url_args=None, url_kwargs=None):
+    """Absolute URL of `url_name` for every configured language."""
+    scheme = "https" if request.is_secure() else "http"
+    host = request.get_host()
+    return dict(
+        _cached_hreflang_urls(
+            url_name,
+            tuple(url_args or ()),
+            tuple(sorted((url_kwargs or {}).items())),
+            scheme,
+            host,
+        )
+    )
+
+
 def add_seo_to_context(
     context, seo_data, request=None, url_name=None, url_args=None, url_kwargs=None
 ):
@@ -124,28 +196,17 @@ def add_seo_to_context(
 
         # Generate canonical URL if not provided but request and url_name are available
         if request and url_name and not seo_data.canonical_url:
-            # Import here to avoid circular imports
-            from django.urls import reverse
+            # Generate hreflang URLs for bilingual support
+            hreflang_urls = get_hreflang_urls(request, url_name, url_args, url_kwargs)
 
-            scheme = "https" if request.is_secure() else "http"
-            host = request.get_host()
-            path = reverse(url_name, args=url_args or [], kwargs=url_kwargs or {})
-            context["canonical_url"] = f"{scheme}://{host}{path}"
+            # The canonical URL is the variant of the active language
+            canonical_url = hreflang_urls.get(translation.get_language())
+            if canonical_url is None:
+                scheme = "https" if request.is_secure() else "http"
+                path = reverse(url_name, args=url_args or [], kwargs=url_kwargs or {})
+                canonical_url = f"{scheme}://{request.get_host()}{path}"
 
-            # Generate hreflang URLs for bilingual support
-            from django.utils import translation
-
-            hreflang_urls = {}
-            current_lang = translation.get_language()
-            try:
-                for lang_code, _lang_name in getattr(settings, "LANGUAGES", ()):
-                    with translation.override(lang_code):
-                        path = reverse(
-                            url_name, args=url_args or [], kwargs=url_kwargs or {}
-                        )
-                        hreflang_urls[lang_code] = f"{scheme}://{host}{path}"
-            finally:
-                translation.activate(current_lang)
+            context["canonical_url"] = canonical_url
             context["hreflang_urls"] = hreflang_urls
 
     return context
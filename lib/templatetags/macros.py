@@ -1,10 +1,42 @@
+import hashlib
+import json
+
 from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
 from django.templatetags.static import static
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 
+from lib.build_info import get_deploy_version
+from lib.responsive_images import CARD_SIZES, get_srcset
+
 register = template.Library()
 
 
+def render_cached_fragment(name, template_name, context):
+    """
+    Render `template_name` with `context`, cached per language, data version
+    and context. Lazy translations in `context` are resolved for the key.
+
+    The macros only render data that ships with the code (cards.py, static
+    files), so the data version is the deploy version.
+    """
+    context_hash = hashlib.md5(
+        json.dumps(context, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    cache_key = (
+        f"fragment:{name}:{get_deploy_version()}:{get_language()}:{context_hash}"
+    )
+
+    html = cache.get(cache_key)
+    if html is None:
+        html = render_to_string(template_name, context)
+        cache.set(cache_key, html, timeout=None)
+    return mark_safe(html)
+
+
 class CustomMessage:
     def __init__(self, tags, message, not_dismissible=False):
         self.tags = tags
@@ -24,37 +56,54 @@ def template_message(tag, message, not_dismissible=False):
     return {"messages": messages}
 
 
-@register.inclusion_tag("macros/card.html")
 def card(card_data):
     """card_data = {
     "title": "Title",
     "description": "Description",
     "button_text": "Button Text",
-    "image_path": "Image/Path",
+    "image": "images/Static-Path.webp",  # or "image_path": "/Image/URL"
     "link": "Link",
     "disable": True/False,
     }
+
+    With a static "image" path, the width-bucketed variants built by
+    `manage.py build_image_variants` are offered via srcset/sizes.
     """
-    return card_data
+    image = card_data.get("image")
+    if not image:
+        return card_data
+    return {
+        **card_data,
+        "image_path": static(image),
+        "image_srcset": get_srcset(image),
+        "image_sizes": CARD_SIZES,
+    }
 
 
-@register.inclusion_tag("macros/card.html")
+@register.simple_tag(name="card")
+def card_tag(card_data):
+    return render_cached_fragment("card", "macros/card.html", card(card_data))
+
+
+@register.simple_tag
 def coming_soon_card():
-    return card(
+    return card_tag(
         {
             "title": _("Coming soon (or never)"),
             "description": _("nothing to be seen here"),
             "button_text": _("Go away"),
-            "image_path": static("images/informatik1_3px.webp"),
+            "image": "images/informatik1_3px.webp",
             "link": "#",
             "disable": True,
         }
     )
 
 
-@register.inclusion_tag("macros/regions.html")
+@register.simple_tag
 def region_select(region):
-    return {"region": region}
+    return render_cached_fragment(
+        "region_select", "macros/regions.html", {"region": region}
+    )
 
 
 @register.inclusion_tag("macros/leaderboard.html")
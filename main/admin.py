@@ -1,4 +1,7 @@
 from django.contrib import admin
+
+from lib.admin import CacheInvalidationAdminMixin
+
 from .models import ExerciseSession, WeekEntry
 
 
@@ -8,14 +11,14 @@ class WeekEntryInline(admin.StackedInline):
 
 
 @admin.register(ExerciseSession)
-class ExerciseSessionAdmin(admin.ModelAdmin):
-    list_display = ("short_name", "name")
+class ExerciseSessionAdmin(CacheInvalidationAdminMixin, admin.ModelAdmin):
+    list_display = ("short_name", "name", "updated_at")
     search_fields = ("short_name", "name")
     inlines = [WeekEntryInline]
 
 
 @admin.register(WeekEntry)
-class WeekEntryAdmin(admin.ModelAdmin):
+class WeekEntryAdmin(CacheInvalidationAdminMixin, admin.ModelAdmin):
     list_display = (
         "exercise_session",
         "week_number",
@@ -0,0 +1,89 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+from django.utils import translation
+
+from lib.template_warmup import reset_template_cache, warmup_templates
+
+
+def format_ms(seconds):
+    return f"{seconds * 1000:.1f} ms"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark first-request vs. steady-state latency of pages, with and "
+        "without the template warmup (lib.template_warmup)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            help="Paths to request. Default: home, Worldle home, practice, TM",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=20,
+            help="Requests per path for the steady state. Default: 20",
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or self.default_paths()
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != "*"]
+        client = Client(HTTP_HOST=hosts[0] if hosts else "localhost")
+
+        compiled, warmup_time = warmup_templates()
+        self.stdout.write(
+            f"🔥 Warmup compiles {compiled} templates in {format_ms(warmup_time)}\n"
+        )
+
+        for path in paths:
+            # Fill the in-process caches (SEO URLs, static manifest, ...)
+            # first, so only template loading differs. The page and fragment
+            # caches are emptied before every timed request (`timed_get`).
+            client.get(path)
+
+            reset_template_cache()
+            cold = self.timed_get(client, path)
+
+            steady = statistics.median(
+                self.timed_get(client, path) for _ in range(options["requests"])
+            )
+
+            reset_template_cache()
+            warmup_templates()
+            warm = self.timed_get(client, path)
+
+            self.stdout.write(
+                f"{path}: first request {format_ms(cold)} cold, "
+                f"{format_ms(warm)} after warmup, steady state {format_ms(steady)}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Benchmarked {len(paths)} paths"))
+
+    def default_paths(self):
+        with translation.override(settings.LANGUAGE_CODE):
+            return [
+                reverse("main:home"),
+                reverse("worldle:home"),
+                reverse("worldle:capitals", args=["worldwide"]),
+                reverse("main:technische_mechanik"),
+            ]
+
+    def timed_get(self, client, path):
+        # Otherwise the anonymous page cache (lib.page_cache) and the
+        # fragment cache (`macros`) answer without loading any template
+        cache.clear()
+        started_at = time.perf_counter()
+        response = client.get(path)
+        elapsed = time.perf_counter() - started_at
+        if response.status_code != 200:
+            self.stderr.write(f"⚠️ {path} returned {response.status_code}")
+        return elapsed
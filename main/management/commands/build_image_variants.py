@@ -0,0 +1,98 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from lib.responsive_images import (
+    MANIFEST_NAME,
+    STATIC_DIR,
+    VARIANT_WIDTHS,
+    VARIANTS_DIR,
+)
+
+
+def format_size(size):
+    return f"{size / 1024:.1f} KB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Build width-bucketed WebP variants of the card images in static/images "
+        "for srcset (written to static/images/variants/, commit the result)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "images",
+            nargs="*",
+            help="Static paths (e.g. images/Bern_3px.webp). Default: images/*.webp",
+        )
+        parser.add_argument(
+            "--widths",
+            type=int,
+            nargs="+",
+            default=list(VARIANT_WIDTHS),
+            help=f"Widths to build. Default: {' '.join(map(str, VARIANT_WIDTHS))}",
+        )
+        parser.add_argument(
+            "--quality",
+            type=int,
+            default=80,
+            help="WebP quality (0-100). Default: 80",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from PIL import Image
+        except ImportError:
+            raise CommandError("Pillow is required: uv sync --group dev")
+
+        if options["images"]:
+            sources = [STATIC_DIR / path for path in options["images"]]
+            missing = [str(path) for path in sources if not path.exists()]
+            if missing:
+                raise CommandError(f"Image not found: {', '.join(missing)}")
+        else:
+            sources = sorted((STATIC_DIR / "images").glob("*.webp"))
+
+        VARIANTS_DIR.mkdir(parents=True, exist_ok=True)
+        manifest_path = VARIANTS_DIR / MANIFEST_NAME
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            manifest = {}
+
+        for source in sources:
+            path = source.relative_to(STATIC_DIR).as_posix()
+            original_size = source.stat().st_size
+            with Image.open(source) as image:
+                width, height = image.size
+                variants = {}
+                sizes = []
+                for target_width in sorted(set(options["widths"])):
+                    if target_width >= width:
+                        continue
+                    target_height = round(height * target_width / width)
+                    target = VARIANTS_DIR / f"{source.stem}-{target_width}w.webp"
+                    image.resize(
+                        (target_width, target_height), Image.Resampling.LANCZOS
+                    ).save(target, "WEBP", quality=options["quality"], method=6)
+                    variants[str(target_width)] = target.relative_to(
+                        STATIC_DIR
+                    ).as_posix()
+                    sizes.append(
+                        f"{target_width}w {format_size(target.stat().st_size)}"
+                    )
+
+            manifest[path] = {"width": width, "variants": variants}
+            self.stdout.write(
+                f"{path} ({width}w {format_size(original_size)}): "
+                + (", ".join(sizes) or "no smaller widths")
+            )
+
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ {len(sources)} images, manifest: {manifest_path}")
+        )
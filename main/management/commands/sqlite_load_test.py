@@ -0,0 +1,138 @@
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test SQLite write throughput with concurrent players "
+        "(default journal mode vs. the tuned settings in DATABASES)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--players",
+            type=int,
+            default=8,
+            help="Number of concurrent players (threads). Default: 8",
+        )
+        parser.add_argument(
+            "--writes",
+            type=int,
+            default=200,
+            help="Highscore/session writes per player. Default: 200",
+        )
+
+    def handle(self, *args, **options):
+        players = options["players"]
+        writes = options["writes"]
+
+        db_options = settings.DATABASES["default"].get("OPTIONS", {})
+        modes = [
+            # Django defaults: rollback journal, deferred transactions
+            ("default", "", None, 5.0),
+            (
+                "tuned",
+                db_options.get("init_command", ""),
+                db_options.get("transaction_mode"),
+                float(db_options.get("timeout", 5)),
+            ),
+        ]
+
+        self.stdout.write(f"🏁 {players} concurrent players x {writes} writes each\n")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, init_command, transaction_mode, timeout in modes:
+                db_path = Path(tmp_dir) / f"{name}.sqlite3"
+                result = self.run_mode(
+                    db_path, init_command, transaction_mode, timeout, players, writes
+                )
+                self.report(name, result)
+
+    def connect(self, db_path, init_command, timeout):
+        conn = sqlite3.connect(db_path, timeout=timeout, isolation_level=None)
+        for statement in init_command.split(";"):
+            if statement := statement.strip():
+                conn.execute(statement)
+        return conn
+
+    def run_mode(
+        self, db_path, init_command, transaction_mode, timeout, players, writes
+    ):
+        conn = self.connect(db_path, init_command, timeout)
+        conn.execute(
+            "CREATE TABLE player (id INTEGER PRIMARY KEY, highscore INTEGER NOT NULL)"
+        )
+        conn.execute("CREATE TABLE session (key TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        conn.executemany(
+            "INSERT INTO player (id, highscore) VALUES (?, 0)",
+            [(player_id,) for player_id in range(players)],
+        )
+        conn.close()
+
+        begin = f"BEGIN {transaction_mode}" if transaction_mode else "BEGIN"
+        committed = [0] * players
+        errors = [0] * players
+        start_barrier = threading.Barrier(players + 1)
+
+        def play(player_id):
+            player_conn = self.connect(db_path, init_command, timeout)
+            start_barrier.wait()
+            for round_number in range(writes):
+                try:
+                    # Same shape as a competitive POST: read the highscore,
+                    # update it and persist the session.
+                    player_conn.execute(begin)
+                    player_conn.execute(
+                        "SELECT highscore FROM player WHERE id = ?", (player_id,)
+                    ).fetchone()
+                    player_conn.execute(
+                        "UPDATE player SET highscore = ? WHERE id = ?",
+                        (round_number, player_id),
+                    )
+                    player_conn.execute(
+                        "INSERT OR REPLACE INTO session (key, data) VALUES (?, ?)",
+                        (f"player-{player_id}", "x" * 512),
+                    )
+                    player_conn.execute("COMMIT")
+                    committed[player_id] += 1
+                except sqlite3.OperationalError:
+                    errors[player_id] += 1
+                    if player_conn.in_transaction:
+                        player_conn.execute("ROLLBACK")
+            player_conn.close()
+
+        threads = [
+            threading.Thread(target=play, args=(player_id,))
+            for player_id in range(players)
+        ]
+        for thread in threads:
+            thread.start()
+
+        start_barrier.wait()
+        started_at = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started_at
+
+        return {
+            "committed": sum(committed),
+            "errors": sum(errors),
+            "elapsed": elapsed,
+        }
+
+    def report(self, name, result):
+        throughput = result["committed"] / result["elapsed"] if result["elapsed"] else 0
+        message = (
+            f"{name:>8}: {result['committed']} writes in {result['elapsed']:.2f}s "
+            f"({throughput:.0f} writes/s), {result['errors']} lock errors"
+        )
+        if result["errors"]:
+            self.stdout.write(self.style.WARNING(f"⚠️  {message}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✅ {message}"))
@@ -0,0 +1,280 @@
+import csv
+import io
+import json
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from lib.cache_versions import deferred_invalidation, invalidate_model
+from main.models import ExerciseSession, WeekEntry
+
+# Columns of the CSV/JSON rows, one row per week entry
+FIELDS = (
+    "short_name",
+    "session_name",
+    "week_number",
+    "materials_number",
+    "exercise_materials_link",
+    "remarks",
+)
+ENTRY_FIELDS = ("materials_number", "exercise_materials_link", "remarks")
+FORMATS = ("csv", "json")
+
+
+def detect_format(path, fmt):
+    if fmt:
+        return fmt
+    suffix = Path(path).suffix.lstrip(".").lower()
+    if suffix not in FORMATS:
+        raise CommandError(f"Cannot tell the format of {path}, pass --format")
+    return suffix
+
+
+class Command(BaseCommand):
+    help = (
+        "Export or bulk import whole semesters of week entries (CSV/JSON). "
+        "Imports are validated, diffed against the database and applied in "
+        "one transaction with bulk_create/bulk_update"
+    )
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest="action", required=True)
+
+        export_parser = subparsers.add_parser("export", help="Export week entries")
+        export_parser.add_argument(
+            "sessions",
+            nargs="*",
+            help="Short names (e.g. TM_HS25). Default: all sessions",
+        )
+        export_parser.add_argument(
+            "--output", "-o", help="File to write. Default: stdout"
+        )
+        export_parser.add_argument("--format", choices=FORMATS)
+
+        import_parser = subparsers.add_parser("import", help="Import week entries")
+        import_parser.add_argument("file", help="CSV or JSON file ('-' for stdin)")
+        import_parser.add_argument("--format", choices=FORMATS)
+        import_parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only validate and show the diff",
+        )
+        import_parser.add_argument(
+            "--delete-missing",
+            action="store_true",
+            help="Delete entries of the imported sessions that are not in the file",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        if options["action"] == "export":
+            self.export_entries(options)
+        else:
+            self.import_entries(options)
+
+    def export_entries(self, options):
+        entries = WeekEntry.objects.select_related("exercise_session").order_by(
+            "exercise_session__short_name", "week_number"
+        )
+        if options["sessions"]:
+            entries = entries.filter(
+                exercise_session__short_name__in=options["sessions"]
+            )
+
+        rows = [
+            {
+                "short_name": entry.exercise_session.short_name,
+                "session_name": entry.exercise_session.name,
+                "week_number": entry.week_number,
+                "materials_number": entry.materials_number,
+                "exercise_materials_link": entry.exercise_materials_link,
+                "remarks": entry.remarks,
+            }
+            for entry in entries
+        ]
+
+        output = options["output"]
+        with ExitStack() as stack:
+            if output:
+                fmt = detect_format(output, options["format"])
+                stream = stack.enter_context(
+                    open(output, "w", encoding="utf-8", newline="")
+                )
+            else:
+                fmt = options["format"] or "json"
+                stream = self.stdout
+            if fmt == "csv":
+                writer = csv.DictWriter(stream, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                stream.write(json.dumps(rows, ensure_ascii=False, indent=2) + "\n")
+
+        if output:
+            self.stdout.write(
+                self.style.SUCCESS(f"✅ Exported {len(rows)} week entries to {output}")
+            )
+
+    def read_rows(self, path, fmt):
+        try:
+            if path == "-":
+                content = sys.stdin.read()
+            else:
+                with open(path, encoding="utf-8", newline="") as f:
+                    content = f.read()
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+
+        if fmt == "csv":
+            # Keep line breaks inside quoted fields (multi-line remarks)
+            return list(csv.DictReader(io.StringIO(content, newline="")))
+        try:
+            rows = json.loads(content)
+        except ValueError as e:
+            raise CommandError(f"Invalid JSON: {e}")
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise CommandError("The JSON file must contain a list of objects")
+        return rows
+
+    def validate(self, rows):
+        """
+        Return ({(short_name, week_number): WeekEntry}, {short_name: name}),
+        raising a CommandError listing all invalid rows.
+        """
+        parsed = {}
+        session_names = {}
+        errors = []
+        for line, row in enumerate(rows, start=1):
+            short_name = str(row.get("short_name") or "").strip()
+            entry = WeekEntry(
+                week_number=row.get("week_number"),
+                materials_number=row.get("materials_number"),
+                exercise_materials_link=row.get("exercise_materials_link") or "",
+                remarks=row.get("remarks") or "",
+            )
+            try:
+                if not short_name:
+                    raise ValidationError({"short_name": "This field is required."})
+                entry.clean_fields(exclude=["exercise_session", "updated_at"])
+            except ValidationError as e:
+                for field, messages in e.message_dict.items():
+                    errors.append(f"row {line}: {field}: {' '.join(messages)}")
+                continue
+
+            key = (short_name, entry.week_number)
+            if key in parsed:
+                errors.append(
+                    f"row {line}: duplicate week {entry.week_number} of {short_name}"
+                )
+                continue
+            parsed[key] = entry
+            if session_name := str(row.get("session_name") or "").strip():
+                session_names.setdefault(short_name, session_name)
+
+        if errors:
+            raise CommandError("Invalid rows:\n" + "\n".join(errors))
+        return parsed, session_names
+
+    def import_entries(self, options):
+        if options["file"] == "-":
+            fmt = options["format"] or "json"
+        else:
+            fmt = detect_format(options["file"], options["format"])
+        parsed, session_names = self.validate(self.read_rows(options["file"], fmt))
+
+        short_names = {short_name for short_name, _week in parsed}
+        sessions = {
+            session.short_name: session
+            for session in ExerciseSession.objects.filter(short_name__in=short_names)
+        }
+        new_sessions = []
+        for short_name in sorted(short_names - set(sessions)):
+            if short_name not in session_names:
+                raise CommandError(f"{short_name} does not exist, add a session_name")
+            new_sessions.append(
+                ExerciseSession(short_name=short_name, name=session_names[short_name])
+            )
+
+        existing = {
+            (entry.exercise_session.short_name, entry.week_number): entry
+            for entry in WeekEntry.objects.filter(
+                exercise_session__short_name__in=short_names
+            ).select_related("exercise_session")
+        }
+
+        to_create, to_update, unchanged = [], [], 0
+        for key, entry in sorted(parsed.items()):
+            current = existing.get(key)
+            if current is None:
+                to_create.append((key, entry))
+                self.log_change("+", key)
+                continue
+            changed = [
+                field
+                for field in ENTRY_FIELDS
+                if getattr(current, field) != getattr(entry, field)
+            ]
+            if changed:
+                for field in changed:
+                    setattr(current, field, getattr(entry, field))
+                to_update.append(current)
+                self.log_change("~", key, changed)
+            else:
+                unchanged += 1
+
+        to_delete = []
+        if options["delete_missing"]:
+            to_delete = [entry for key, entry in existing.items() if key not in parsed]
+            for entry in to_delete:
+                self.log_change(
+                    "-", (entry.exercise_session.short_name, entry.week_number)
+                )
+
+        summary = (
+            f"{len(new_sessions)} new sessions, {len(to_create)} to create, "
+            f"{len(to_update)} to update, {len(to_delete)} to delete, "
+            f"{unchanged} unchanged"
+        )
+        if options["dry_run"]:
+            self.stdout.write(f"🔍 Dry run: {summary}")
+            return
+
+        # Invalidation outside the transaction: the caches are bumped after
+        # the commit, so no request can re-cache the old rows under the new
+        # version
+        with deferred_invalidation(), transaction.atomic():
+            for session in ExerciseSession.objects.bulk_create(new_sessions):
+                sessions[session.short_name] = session
+            for (short_name, _week), entry in to_create:
+                entry.exercise_session = sessions[short_name]
+            WeekEntry.objects.bulk_create([entry for _key, entry in to_create])
+
+            # bulk_update() skips auto_now
+            now = timezone.now()
+            for entry in to_update:
+                entry.updated_at = now
+            WeekEntry.objects.bulk_update(to_update, [*ENTRY_FIELDS, "updated_at"])
+
+            if to_delete:
+                WeekEntry.objects.filter(pk__in=[e.pk for e in to_delete]).delete()
+
+            # Bulk operations send no signals: touch the semesters like
+            # main.signals does for single saves and invalidate their caches
+            ExerciseSession.objects.filter(short_name__in=short_names).update(
+                updated_at=now
+            )
+            invalidate_model(WeekEntry)
+            invalidate_model(ExerciseSession)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Imported: {summary}"))
+
+    def log_change(self, sign, key, fields=()):
+        if self.verbosity >= 2:
+            short_name, week_number = key
+            details = f" ({', '.join(fields)})" if fields else ""
+            self.stdout.write(f"{sign} {short_name} week {week_number}{details}")
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-19 18:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0006_auto_20250812_1727"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="exercisesession",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                verbose_name="Last modified",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="weekentry",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                verbose_name="Last modified",
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -1,6 +1,14 @@
+from django.core.cache import cache
 from django.db import models
+from django.db.models import Prefetch
 from django.utils.translation import gettext_lazy as _
 
+from lib.build_info import get_build_time
+from lib.cache_versions import get_cache_version
+
+# Version tag of everything cached from the TM pages (see main.signals)
+TM_PAGES_CACHE_TAG = "tm_pages"
+
 
 class ExerciseSession(models.Model):
     short_name = models.CharField(
@@ -15,6 +23,13 @@ class ExerciseSession(models.Model):
         help_text=_("Name of the exercise session (e.g. Engineering Mechanics HS24)."),
     )
 
+    # Also touched whenever one of its week entries changes (see main.signals),
+    # so it is the last modification of the whole semester page.
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_("Last modified"),
+    )
+
     class Meta:
         verbose_name = _("Exercise Session")
         verbose_name_plural = _("Exercise Sessions")
@@ -65,6 +80,11 @@ class WeekEntry(models.Model):
         default="",
     )
 
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_("Last modified"),
+    )
+
     class Meta:
         verbose_name = _("Week Entry")
         verbose_name_plural = _("Week Entries")
@@ -77,3 +97,38 @@ class WeekEntry(models.Model):
     @property
     def has_exercise_materials(self):
         return self.exercise_materials_link != self.NO_LINK_AVAILABLE
+
+
+def get_tm_sessions():
+    """
+    All TM sessions, newest semester first, with their week entries.
+
+    Fetched in one go (sessions + prefetched week entries) and cached until
+    a session or week entry changes (see main.signals).
+    """
+    cache_key = f"tm_sessions:{get_cache_version(TM_PAGES_CACHE_TAG)}"
+    sessions = cache.get(cache_key)
+    if sessions is None:
+        sessions = list(
+            ExerciseSession.objects.filter(short_name__startswith="TM_")
+            .order_by("-short_name")
+            .prefetch_related(
+                Prefetch(
+                    "week_entries",
+                    queryset=WeekEntry.objects.order_by("week_number"),
+                )
+            )
+        )
+        cache.set(cache_key, sessions, timeout=None)
+    return sessions
+
+
+def get_tm_pages_lastmod():
+    """
+    Last modification of the Engineering Mechanics pages.
+
+    Every semester page lists all semesters, so the latest change of any TM
+    session (or a deployment) modifies all of them.
+    """
+    latest = max((session.updated_at for session in get_tm_sessions()), default=None)
+    return max(filter(None, [get_build_time(), latest]))
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from lib.cache_versions import register_cache_tags
+from nethz_django.sitemaps import SITEMAP_CACHE_TAG
+
+from .models import TM_PAGES_CACHE_TAG, ExerciseSession, WeekEntry
+
+
+@receiver(post_save, sender=WeekEntry)
+@receiver(post_delete, sender=WeekEntry)
+def touch_exercise_session(sender, instance, **kwargs):
+    """Keep `ExerciseSession.updated_at` the lastmod of the whole semester page."""
+    # update() instead of save() to not re-trigger the session signals
+    ExerciseSession.objects.filter(pk=instance.exercise_session_id).update(
+        updated_at=timezone.now()
+    )
+
+
+# Semester pages and their lastmod are listed in the sitemap, and every TM
+# page lists all semesters. Registered after the receiver above, so the tags
+# are bumped once `updated_at` is current.
+register_cache_tags(ExerciseSession, SITEMAP_CACHE_TAG, TM_PAGES_CACHE_TAG)
+register_cache_tags(WeekEntry, SITEMAP_CACHE_TAG, TM_PAGES_CACHE_TAG)
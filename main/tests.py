@@ -1,12 +1,64 @@
-from django.test import TestCase
-from django.urls import reverse
+import gzip
+import json
+import re
+import tempfile
+import time
+from dataclasses import FrozenInstanceError
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+import brotli
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.shortcuts import render
+from django.template import Context, Template, engines
+from django.template.loader import render_to_string
+from django.template.loaders.cached import Loader as CachedLoader
 from django.templatetags.static import static
-
-from .models import ExerciseSession
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import translation
+from django.utils.http import http_date
+
+from lib import build_info
+from lib.cache_versions import (
+    deferred_invalidation,
+    get_cache_version,
+    get_model_cache_tags,
+)
+from lib.page_cache import CSRF_TOKEN_PLACEHOLDER
+from lib.responsive_images import CARD_SIZES, STATIC_DIR, load_variant_manifest
+from lib.seo_utils import _cached_hreflang_urls, get_technische_mechanik_seo
+from lib.template_warmup import (
+    iter_template_names,
+    reset_template_cache,
+    warmup_templates,
+)
+from lib.templatetags.macros import card
+from nethz_django.middleware import PrecompressedWhiteNoiseMiddleware
+from nethz_django.sitemaps import SITEMAP_CACHE_TAG
+from nethz_django.storage import (
+    MaxLevelCompressor,
+    PrecompressedManifestStaticFilesStorage,
+)
+
+from .models import (
+    TM_PAGES_CACHE_TAG,
+    ExerciseSession,
+    WeekEntry,
+    get_tm_pages_lastmod,
+    get_tm_sessions,
+)
 
 
 class MainViewsTest(TestCase):
     def setUp(self):
+        cache.clear()
         ExerciseSession.objects.get_or_create(
             short_name="TM_HS24",
             defaults={"name": "Engineering Mechanics HS24"},
@@ -173,3 +225,680 @@ class MainViewsTest(TestCase):
             f'class="nav-link active" href="{tm_link}"',
             html=False,
         )
+
+
+class SQLiteTuningTest(TestCase):
+    def test_connection_uses_busy_timeout(self):
+        """Test that the init_command PRAGMAs are applied on connect"""
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+    def test_sqlite_load_test_command(self):
+        """Test that the load test runs both modes without lock errors when tuned"""
+        out = StringIO()
+        call_command("sqlite_load_test", players=2, writes=5, stdout=out)
+        output = out.getvalue()
+        self.assertIn("default:", output)
+        self.assertRegex(
+            output,
+            r"(?m)^✅ +tuned: 10 writes in [\d.]+s \(\d+ writes/s\), 0 lock errors$",
+        )
+
+
+class SEOUtilsTest(TestCase):
+    def setUp(self):
+        _cached_hreflang_urls.cache_clear()
+        # Render the pages instead of serving them from the page cache
+        cache.clear()
+
+    def test_canonical_and_hreflang_urls(self):
+        """Test canonical URL matches the hreflang entry of the active language"""
+        response = self.client.get(reverse("main:home"))
+        hreflang_urls = response.context["hreflang_urls"]
+        self.assertEqual(set(hreflang_urls), {"de", "en"})
+        self.assertEqual(hreflang_urls["en"], "http://testserver/en/")
+        self.assertEqual(response.context["canonical_url"], hreflang_urls["de"])
+
+    def test_hreflang_urls_are_memoized(self):
+        """Test repeated renders reuse the memoized hreflang URLs"""
+        self.client.get(reverse("main:home"))
+        cache.clear()
+        self.client.get(reverse("main:home"))
+        cache_info = _cached_hreflang_urls.cache_info()
+        self.assertEqual(cache_info.misses, 1)
+        self.assertEqual(cache_info.hits, 1)
+
+    def test_seo_data_is_memoized_per_language(self):
+        """Test SEO helpers return one shared, immutable object per language"""
+        with translation.override("de"):
+            seo_de = get_technische_mechanik_seo("HS24")
+            self.assertIs(get_technische_mechanik_seo("HS24"), seo_de)
+        with translation.override("en"):
+            seo_en = get_technische_mechanik_seo("HS24")
+        self.assertIsNot(seo_en, seo_de)
+        self.assertEqual(seo_en.title, "Engineering Mechanics HS24")
+
+        with self.assertRaises(FrozenInstanceError):
+            seo_en.title = "changed"
+
+
+class SitemapTest(TestCase):
+    def setUp(self):
+        ExerciseSession.objects.get_or_create(
+            short_name="TM_HS24",
+            defaults={"name": "Engineering Mechanics HS24"},
+        )
+
+    def test_sitemap_served_gzip_with_etag(self):
+        """Test sitemap is served precompressed and honours If-None-Match"""
+        response = self.client.get("/sitemap.xml", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        content = gzip.decompress(response.content).decode()
+        self.assertIn("/technische-mechanik/hs24/", content)
+
+        response = self.client.get("/sitemap.xml", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_sitemap_served_brotli(self):
+        """Test sitemap prefers the brotli variant when accepted"""
+        response = self.client.get("/sitemap.xml", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "br")
+        content = brotli.decompress(response.content).decode()
+        self.assertIn("/technische-mechanik/hs24/", content)
+
+    def test_sitemap_invalidated_on_exercise_session_change(self):
+        """Test a new semester shows up in the cached sitemap"""
+        response = self.client.get("/sitemap.xml")
+        self.assertNotContains(response, "/technische-mechanik/hs26/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ExerciseSession.objects.create(
+                short_name="TM_HS26", name="Engineering Mechanics HS26"
+            )
+        response = self.client.get("/sitemap.xml")
+        self.assertContains(response, "/technische-mechanik/hs26/")
+
+
+class LastModifiedTest(TestCase):
+    def setUp(self):
+        self.session = ExerciseSession.objects.create(
+            short_name="TM_HS30", name="Engineering Mechanics HS30"
+        )
+
+    def test_week_entry_save_touches_exercise_session(self):
+        """Test editing a week entry updates the semester's lastmod"""
+        before = self.session.updated_at
+        with self.captureOnCommitCallbacks(execute=True):
+            WeekEntry.objects.create(
+                exercise_session=self.session, week_number=1, materials_number=1
+            )
+        self.session.refresh_from_db()
+        self.assertGreater(self.session.updated_at, before)
+        self.assertEqual(get_tm_pages_lastmod(), self.session.updated_at)
+
+    def test_anonymous_if_modified_since_returns_304(self):
+        """Test crawlers revalidating an unchanged page get a 304"""
+        url = reverse("main:technische_mechanik_semester", args=["HS30"])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_authenticated_users_get_full_render(self):
+        """Test logged in users never get a data-only 304"""
+        user = get_user_model().objects.create_user(
+            username="tmuser", email="tm@example.com", password="testpass"
+        )
+        user.is_email_verified = True
+        user.save()
+        self.client.force_login(user)
+
+        url = reverse("main:technische_mechanik_semester", args=["HS30"])
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 3600)
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_build_time_is_recorded_at_build(self):
+        """Test the build time comes from BUILD_TIME, not file mtimes"""
+        with tempfile.TemporaryDirectory() as tmp:
+            build_time_file = Path(tmp) / "BUILD_TIME"
+            build_time_file.write_text("1700000000\n")
+            with patch.object(build_info, "BUILD_TIME_FILE", build_time_file):
+                self.assertEqual(build_info.read_build_time().timestamp(), 1700000000)
+                with patch.dict("os.environ", {"BUILD_TIME": "1800000000"}):
+                    self.assertEqual(
+                        build_info.read_build_time().timestamp(), 1800000000
+                    )
+            # Without a recorded build time, the process start is used
+            with (
+                patch.object(build_info, "BUILD_TIME_FILE", Path(tmp) / "missing"),
+                patch.dict("os.environ", {"BUILD_TIME": ""}),
+            ):
+                self.assertIsNone(build_info.read_build_time())
+
+    def test_sitemap_contains_lastmod(self):
+        """Test sitemap entries carry real lastmod values"""
+        response = self.client.get("/sitemap.xml")
+        self.assertContains(response, "<lastmod>")
+
+
+class RobotsTxtTest(TestCase):
+    def test_robots_txt_references_sitemap_of_host(self):
+        """Test robots.txt is cached per host with the matching sitemap URL"""
+        response = self.client.get("/robots.txt", HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Sitemap: http://localhost/sitemap.xml")
+        self.assertEqual(response["Cache-Control"], "public, max-age=86400")
+
+        response = self.client.get("/robots.txt", HTTP_HOST="127.0.0.1")
+        self.assertContains(response, "Sitemap: http://127.0.0.1/sitemap.xml")
+
+    def test_robots_txt_etag(self):
+        """Test robots.txt revalidation returns a 304"""
+        response = self.client.get("/robots.txt")
+        response = self.client.get("/robots.txt", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_robots_txt_skips_session_middleware(self):
+        """Test robots.txt is served before the session/auth stack"""
+        response = self.client.get("/robots.txt")
+        self.assertNotIn("Cookie", response.get("Vary", ""))
+        self.assertNotIn("sessionid", response.cookies)
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+
+
+class PrecompressedStaticFilesTest(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = Path(self.tmpdir.name)
+        # Compressible, big enough to pay off
+        (self.root / "flag.svg").write_text(
+            "<svg>" + '<rect width="1" height="1"/>' * 500 + "</svg>"
+        )
+        # Too small to save a packet
+        (self.root / "tiny.svg").write_text("<svg/>")
+        (self.root / "photo.png").write_bytes(b"\x89PNG" + b"\0" * 4096)
+
+    def test_compressor_skips_what_does_not_pay_off(self):
+        compressor = MaxLevelCompressor(quiet=True)
+
+        self.assertTrue(compressor.should_compress("flag.svg"))
+        self.assertTrue(compressor.should_compress("countries.JSON"))
+        self.assertFalse(compressor.should_compress("photo.png"))
+
+        written = compressor.compress(str(self.root / "flag.svg"))
+        self.assertIn(str(self.root / "flag.svg.gz"), written)
+        self.assertEqual(compressor.compress(str(self.root / "tiny.svg")), [])
+        self.assertFalse((self.root / "tiny.svg.gz").exists())
+
+        sizes = compressor.report[str(self.root / "flag.svg")]
+        self.assertLess(sizes["gzip"], sizes["identity"])
+        self.assertLessEqual(sizes["br"], sizes["gzip"])
+        self.assertIn("zstd", sizes)
+
+    def test_storage_logs_size_report(self):
+        storage = PrecompressedManifestStaticFilesStorage(location=str(self.root))
+
+        with self.assertLogs("nethz_django.storage", "INFO") as logs:
+            compressed = list(
+                storage.compress_files(["flag.svg", "tiny.svg", "photo.png"])
+            )
+
+        self.assertIn(("flag.svg", "flag.svg.gz"), compressed)
+        self.assertIn(("flag.svg", "flag.svg.br"), compressed)
+        self.assertIn(("flag.svg", "flag.svg.zst"), compressed)
+        self.assertIn("Precompressed 1 of 2 files", logs.output[0])
+        # Nothing but the variants is written into STATIC_ROOT
+        self.assertEqual(
+            sorted(path.name for path in self.root.iterdir()),
+            [
+                "flag.svg",
+                "flag.svg.br",
+                "flag.svg.gz",
+                "flag.svg.zst",
+                "photo.png",
+                "tiny.svg",
+            ],
+        )
+
+    def test_middleware_serves_zstd_variant(self):
+        MaxLevelCompressor(quiet=True).compress(str(self.root / "flag.svg"))
+        middleware = PrecompressedWhiteNoiseMiddleware(lambda request: None)
+        middleware.add_files(str(self.root), prefix="/precompressed/")
+        factory = RequestFactory()
+
+        response = middleware(
+            factory.get("/precompressed/flag.svg", HTTP_ACCEPT_ENCODING="zstd")
+        )
+        self.assertEqual(response["Content-Encoding"], "zstd")
+
+        response = middleware(
+            factory.get("/precompressed/flag.svg", HTTP_ACCEPT_ENCODING="gzip")
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        # Compressed variants are not served as files of their own
+        self.assertIsNone(
+            middleware(factory.get("/precompressed/flag.svg.zst")),
+        )
+
+
+class ResponsiveImagesTest(TestCase):
+    def test_home_cards_have_srcset(self):
+        response = self.client.get(reverse("main:home"))
+
+        variant = static("images/variants/Earth_2px-320w.webp")
+        self.assertContains(response, f"{variant} 320w")
+        self.assertContains(response, f"{static('images/Earth_2px.webp')} 1920w")
+        self.assertContains(response, f'sizes="{CARD_SIZES}"')
+
+    def test_variants_exist(self):
+        for path, entry in load_variant_manifest().items():
+            for width, variant in entry["variants"].items():
+                with self.subTest(variant=variant):
+                    self.assertLess(int(width), entry["width"])
+                    self.assertTrue((STATIC_DIR / variant).exists())
+
+    def test_card_without_variants(self):
+        context = card({"title": "Test", "image": "images/favicon.png"})
+        self.assertEqual(context["image_path"], static("images/favicon.png"))
+        self.assertEqual(context["image_srcset"], "")
+
+        # Plain image URLs are passed through
+        context = card({"title": "Test", "image_path": "/img.webp"})
+        self.assertEqual(context["image_path"], "/img.webp")
+        self.assertNotIn("image_srcset", context)
+
+
+class TemplateWarmupTest(TestCase):
+    def test_templates_use_cached_loader(self):
+        loader = engines["django"].engine.template_loaders[0]
+        self.assertIsInstance(loader, CachedLoader)
+
+    def test_warmup_compiles_all_templates(self):
+        reset_template_cache()
+        names = list(iter_template_names())
+
+        with self.assertLogs("nethz_django.templates", level="INFO"):
+            compiled, _elapsed = warmup_templates()
+
+        self.assertEqual(compiled, len(names))
+        self.assertIn("components/_base.html", names)
+        loader = engines["django"].engine.template_loaders[0]
+        self.assertIn("components/_base.html", loader.get_template_cache)
+
+    def test_benchmark_templates_command(self):
+        out = StringIO()
+        with patch("main.views.render", wraps=render) as render_mock:
+            call_command(
+                "benchmark_templates", reverse("main:home"), requests=2, stdout=out
+            )
+        # Priming, cold, 2 steady and warm: no timed request is a cache hit
+        self.assertEqual(render_mock.call_count, 5)
+        output = out.getvalue()
+        self.assertIn("after warmup", output)
+        self.assertIn("Benchmarked 1 paths", output)
+
+
+class FragmentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def render(self, source, **context):
+        return Template("{% load macros %}" + source).render(Context(context))
+
+    def test_card_is_rendered_once(self):
+        card_data = {"title": "Test", "image": "images/favicon.png", "link": "/"}
+        with patch(
+            "lib.templatetags.macros.render_to_string", wraps=render_to_string
+        ) as render_mock:
+            first = self.render("{% card card_data %}", card_data=card_data)
+            second = self.render("{% card card_data %}", card_data=card_data)
+
+        self.assertEqual(render_mock.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertIn('alt="Test"', first)
+
+    def test_fragments_are_cached_per_language(self):
+        with patch(
+            "lib.templatetags.macros.render_to_string", wraps=render_to_string
+        ) as render_mock:
+            for language in ("de", "en", "de"):
+                with translation.override(language):
+                    self.render("{% region_select 'europe' %}")
+
+        self.assertEqual(render_mock.call_count, 2)
+
+    def test_new_version_invalidates_fragments(self):
+        self.render("{% coming_soon_card %}")
+        with (
+            patch("lib.templatetags.macros.get_deploy_version", return_value="next"),
+            patch(
+                "lib.templatetags.macros.render_to_string", wraps=render_to_string
+            ) as render_mock,
+        ):
+            self.render("{% coming_soon_card %}")
+
+        self.assertEqual(render_mock.call_count, 1)
+
+
+class PageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.session, _created = ExerciseSession.objects.get_or_create(
+            short_name="TM_HS24", defaults={"name": "Engineering Mechanics HS24"}
+        )
+
+    def test_anonymous_page_is_rendered_once(self):
+        first = self.client.get(reverse("main:home"))
+        second = self.client.get(reverse("main:home"))
+
+        self.assertIsNotNone(first.context)
+        self.assertIsNone(second.context)
+        self.assertEqual(second.status_code, 200)
+        self.assertIn("Host", second["Vary"])
+        self.assertIn("Cookie", second["Vary"])
+
+    def test_scheme_is_part_of_the_key(self):
+        """Test a plain http hit doesn't serve http canonical URLs over https"""
+        self.client.get(reverse("main:home"))
+        response = self.client.get(reverse("main:home"), secure=True)
+
+        self.assertIsNotNone(response.context)
+        self.assertContains(response, "https://testserver/")
+        self.assertNotContains(response, "http://testserver/")
+
+    def test_csrf_token_is_fresh_per_visitor(self):
+        self.client.get(reverse("main:home"))
+        client = Client(enforce_csrf_checks=True)
+        response = client.get(reverse("main:home"))
+
+        self.assertIsNone(response.context)
+        self.assertNotIn(CSRF_TOKEN_PLACEHOLDER, response.content)
+        token = re.search(
+            rb'name="csrfmiddlewaretoken" value="([^"]+)"', response.content
+        )[1].decode()
+        response = client.post(
+            reverse("set_language"),
+            {"language": "en", "next": "/en/", "csrfmiddlewaretoken": token},
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_logged_in_users_bypass_cache(self):
+        user = get_user_model().objects.create_user(
+            username="cached", email="cached@example.com", password="testpass"
+        )
+        user.is_email_verified = True
+        user.save()
+        self.client.get(reverse("main:home"))
+        self.client.force_login(user)
+
+        response = self.client.get(reverse("main:home"))
+
+        self.assertIsNotNone(response.context)
+        self.assertContains(response, "cached")
+
+    def test_tm_page_is_invalidated_on_save(self):
+        url = reverse("main:technische_mechanik_semester", args=["HS24"])
+        self.assertNotContains(self.client.get(url), "Cached remark")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            WeekEntry.objects.create(
+                exercise_session=self.session,
+                week_number=1,
+                materials_number=1,
+                remarks="Cached remark",
+            )
+
+        self.assertContains(self.client.get(url), "Cached remark")
+
+
+class TMSessionsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.session, _created = ExerciseSession.objects.get_or_create(
+            short_name="TM_HS24", defaults={"name": "Engineering Mechanics HS24"}
+        )
+        for week_number in (2, 1):
+            WeekEntry.objects.create(
+                exercise_session=self.session,
+                week_number=week_number,
+                materials_number=week_number,
+            )
+
+    def test_sessions_are_fetched_once(self):
+        # Sessions + prefetched week entries
+        with self.assertNumQueries(2):
+            sessions = get_tm_sessions()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_tm_sessions(), sessions)
+            session = next(s for s in sessions if s.pk == self.session.pk)
+            weeks = [entry.week_number for entry in session.week_entries.all()]
+        self.assertEqual(weeks, [1, 2])
+
+    def test_sessions_are_invalidated_on_save(self):
+        get_tm_sessions()
+        with self.captureOnCommitCallbacks(execute=True):
+            WeekEntry.objects.create(
+                exercise_session=self.session, week_number=3, materials_number=3
+            )
+
+        session = next(s for s in get_tm_sessions() if s.pk == self.session.pk)
+        self.assertEqual(len(session.week_entries.all()), 3)
+
+    def test_semester_lookup_is_case_insensitive(self):
+        response = self.client.get(
+            reverse("main:technische_mechanik_semester", args=["hs24"])
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["current_semester"], "HS24")
+        self.assertEqual(response.context["exercise_session"], self.session)
+
+
+class CacheInvalidationTest(TestCase):
+    def setUp(self):
+        self.session, _created = ExerciseSession.objects.get_or_create(
+            short_name="TM_HS24", defaults={"name": "Engineering Mechanics HS24"}
+        )
+
+    def test_models_are_mapped_to_tags(self):
+        for model in (ExerciseSession, WeekEntry):
+            with self.subTest(model=model):
+                self.assertEqual(
+                    get_model_cache_tags(model),
+                    {SITEMAP_CACHE_TAG, TM_PAGES_CACHE_TAG},
+                )
+
+    def test_deferred_invalidation_bumps_once(self):
+        before = get_cache_version(TM_PAGES_CACHE_TAG)
+        with patch(
+            "lib.cache_versions._new_token", side_effect=["1", "2", "3", "4"]
+        ) as token_mock:
+            with (
+                self.captureOnCommitCallbacks(execute=True),
+                deferred_invalidation(),
+            ):
+                for week_number in (1, 2, 3):
+                    WeekEntry.objects.create(
+                        exercise_session=self.session,
+                        week_number=week_number,
+                        materials_number=1,
+                    )
+                self.assertEqual(get_cache_version(TM_PAGES_CACHE_TAG), before)
+
+        # One new token per tag
+        self.assertEqual(token_mock.call_count, 2)
+        self.assertNotEqual(get_cache_version(TM_PAGES_CACHE_TAG), before)
+
+    def test_bump_waits_for_commit(self):
+        before = get_cache_version(TM_PAGES_CACHE_TAG)
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                WeekEntry.objects.create(
+                    exercise_session=self.session, week_number=1, materials_number=1
+                )
+            # Not bumped while the data isn't committed yet
+            self.assertEqual(get_cache_version(TM_PAGES_CACHE_TAG), before)
+
+        self.assertTrue(callbacks)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_cache_version(TM_PAGES_CACHE_TAG), before)
+
+    def test_admin_bulk_action_invalidates(self):
+        admin_user = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="testpass"
+        )
+        admin_user.is_email_verified = True
+        admin_user.save()
+        self.client.force_login(admin_user)
+        entry = WeekEntry.objects.create(
+            exercise_session=self.session, week_number=1, materials_number=1
+        )
+        before = get_cache_version(TM_PAGES_CACHE_TAG)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("admin:main_weekentry_changelist"),
+                {
+                    "action": "delete_selected",
+                    ACTION_CHECKBOX_NAME: [entry.pk],
+                    "post": "yes",
+                },
+            )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(WeekEntry.objects.exists())
+        self.assertNotEqual(get_cache_version(TM_PAGES_CACHE_TAG), before)
+
+
+class WeekEntriesCommandTest(TestCase):
+    def setUp(self):
+        self.session, _created = ExerciseSession.objects.get_or_create(
+            short_name="TM_HS24", defaults={"name": "Engineering Mechanics HS24"}
+        )
+        for week_number in (1, 2):
+            WeekEntry.objects.create(
+                exercise_session=self.session,
+                week_number=week_number,
+                materials_number=week_number,
+            )
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def write(self, name, content):
+        path = Path(self.tmp_dir.name) / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def test_export_import_roundtrip(self):
+        path = str(Path(self.tmp_dir.name) / "hs24.json")
+        call_command(
+            "week_entries", "export", "TM_HS24", output=path, stdout=StringIO()
+        )
+        rows = json.loads(Path(path).read_text(encoding="utf-8"))
+        self.assertEqual([row["week_number"] for row in rows], [1, 2])
+
+        rows[0]["remarks"] = "Updated"
+        rows.append({**rows[1], "week_number": 3})
+        Path(path).write_text(json.dumps(rows), encoding="utf-8")
+        out = StringIO()
+        call_command("week_entries", "import", path, stdout=out)
+
+        self.assertIn("0 new sessions, 1 to create, 1 to update", out.getvalue())
+        self.assertIn("1 unchanged", out.getvalue())
+        self.assertEqual(
+            WeekEntry.objects.get(exercise_session=self.session, week_number=1).remarks,
+            "Updated",
+        )
+        self.assertEqual(self.session.week_entries.count(), 3)
+
+    def test_csv_roundtrip_keeps_multiline_remarks(self):
+        remarks = 'line1\r\nline2\n<p>HTML, "quoted"</p>'
+        WeekEntry.objects.filter(week_number=1).update(remarks=remarks)
+        path = str(Path(self.tmp_dir.name) / "hs24.csv")
+        call_command(
+            "week_entries", "export", "TM_HS24", output=path, stdout=StringIO()
+        )
+        WeekEntry.objects.filter(week_number=1).update(remarks="")
+
+        out = StringIO()
+        call_command("week_entries", "import", path, stdout=out)
+
+        self.assertIn("1 to update", out.getvalue())
+        self.assertEqual(
+            WeekEntry.objects.get(exercise_session=self.session, week_number=1).remarks,
+            remarks,
+        )
+
+    def test_csv_import_creates_semester(self):
+        path = self.write(
+            "hs26.csv",
+            "short_name,session_name,week_number,materials_number\n"
+            "TM_HS26,Engineering Mechanics HS26,1,1\n"
+            "TM_HS26,,2,2\n",
+        )
+        before = get_cache_version(TM_PAGES_CACHE_TAG)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("week_entries", "import", path, stdout=StringIO())
+
+        session = ExerciseSession.objects.get(short_name="TM_HS26")
+        self.assertEqual(session.name, "Engineering Mechanics HS26")
+        self.assertEqual(
+            list(session.week_entries.values_list("week_number", flat=True)), [1, 2]
+        )
+        self.assertNotEqual(get_cache_version(TM_PAGES_CACHE_TAG), before)
+
+    def test_invalid_rows_are_rejected(self):
+        path = self.write(
+            "broken.csv",
+            "short_name,week_number,materials_number\n"
+            "TM_HS24,x,1\n"
+            "TM_HS24,5,1\n"
+            "TM_HS24,5,2\n",
+        )
+
+        with self.assertRaisesMessage(CommandError, "row 1: week_number") as cm:
+            call_command("week_entries", "import", path, stdout=StringIO())
+        self.assertIn("row 3: duplicate week 5", str(cm.exception))
+        self.assertEqual(self.session.week_entries.count(), 2)
+
+    def test_dry_run_and_delete_missing(self):
+        path = self.write(
+            "hs24.json",
+            json.dumps(
+                [{"short_name": "TM_HS24", "week_number": 1, "materials_number": 1}]
+            ),
+        )
+
+        out = StringIO()
+        call_command(
+            "week_entries",
+            "import",
+            path,
+            dry_run=True,
+            delete_missing=True,
+            stdout=out,
+        )
+        self.assertIn("Dry run: 0 new sessions, 0 to create", out.getvalue())
+        self.assertIn("1 to delete", out.getvalue())
+        self.assertEqual(self.session.week_entries.count(), 2)
+
+        call_command(
+            "week_entries", "import", path, delete_missing=True, stdout=StringIO()
+        )
+        self.assertEqual(
+            list(self.session.week_entries.values_list("week_number", flat=True)), [1]
+        )
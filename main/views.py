@@ -1,19 +1,22 @@
 from django.http import Http404
 from django.shortcuts import render
-from django.templatetags.static import static
 from django.urls import reverse
 from django.utils.translation import gettext as _
 
-from .models import ExerciseSession
-from django.db.models import Q
+from .models import TM_PAGES_CACHE_TAG, get_tm_pages_lastmod, get_tm_sessions
+from lib.build_info import get_build_time
+from lib.conditional import anonymous_last_modified
+from lib.page_cache import anonymous_page_cache
 from lib.seo_utils import get_home_seo, get_technische_mechanik_seo, add_seo_to_context
 
 
+@anonymous_last_modified(lambda request: get_build_time())
+@anonymous_page_cache()
 def home(request):
     tm_card = {
         "title": _("Engineering Mechanics"),
         "button_text": _("To the documents"),
-        "image_path": static("images/technische_mechanik_6px.webp"),
+        "image": "images/technische_mechanik_6px.webp",
         "link": reverse("main:technische_mechanik"),
         "disable": False,
     }
@@ -21,7 +24,7 @@ def home(request):
     inf_card = {
         "title": _("Computer Science I 2024"),
         "button_text": _("To the documents"),
-        "image_path": static("images/informatik1_3px.webp"),
+        "image": "images/informatik1_3px.webp",
         "link": "#",
         "disable": True,
     }
@@ -30,7 +33,7 @@ def home(request):
         "title": "Worldle",
         "description": _("Various country quizzes"),
         "button_text": _("To the game modes"),
-        "image_path": static("images/Earth_2px.webp"),
+        "image": "images/Earth_2px.webp",
         "link": reverse("worldle:home"),
         "disable": False,
     }
@@ -48,37 +51,39 @@ def home(request):
     return render(request, "main/home.html", context)
 
 
+@anonymous_last_modified(lambda request, semester=None: get_tm_pages_lastmod())
+@anonymous_page_cache(tag=TM_PAGES_CACHE_TAG)
 def technische_mechanik(request, semester: str | None = None):
-    # Get all available TM exercise sessions
-    tm_sessions = ExerciseSession.objects.filter(
-        Q(short_name__startswith="TM_")
-    ).order_by("-short_name")
+    # All TM exercise sessions with their week entries, newest first
+    tm_sessions = get_tm_sessions()
 
-    if not tm_sessions.exists():
+    if not tm_sessions:
         raise Http404("No Engineering Mechanics sessions available")
 
+    # Get available semesters for dropdown
+    available_semesters = [
+        session.short_name.replace("TM_", "") for session in tm_sessions
+    ]
+
     # If no semester specified, use the latest one (HS25 > HS24)
     if not semester:
-        current_session = tm_sessions.first()
-        current_semester = current_session.short_name.replace("TM_", "")
+        current_session = tm_sessions[0]
     else:
-        template_name = f"TM_{semester}"
-        current_session = tm_sessions.filter(short_name=template_name).first()
+        # Case-insensitive, the sitemap links the lowercase form ("hs24")
+        current_session = next(
+            (
+                session
+                for session, available in zip(tm_sessions, available_semesters)
+                if available.lower() == semester.lower()
+            ),
+            None,
+        )
         if not current_session:
             raise Http404("Invalid semester")
-        current_semester = semester
-
-    # Get available semesters for dropdown
-    available_semesters = [
-        session.short_name.replace("TM_", "") for session in tm_sessions
-    ]
+    current_semester = current_session.short_name.replace("TM_", "")
 
-    # Get the week entries (optimized query)
-    week_entries = (
-        current_session.week_entries.all().order_by("week_number")
-        if current_session
-        else None
-    )
+    # Prefetched and ordered by week number in get_tm_sessions()
+    week_entries = current_session.week_entries.all()
 
     context = {
         "exercise_session": current_session,
@@ -1,9 +1,14 @@
+import os
+from wsgiref.headers import Headers
+
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import logout
 from django.http import HttpResponsePermanentRedirect, HttpResponseRedirect
 from django.utils import translation
 from django.utils.translation import gettext_lazy as _
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.responders import MissingFileError, StaticFile
 
 
 class SEORedirectMiddleware:
@@ -135,3 +140,72 @@ class RemoveNoindexHeaderMiddleware:
             del response["X-Robots-Tag"]
 
         return response
+
+
+class CrawlerFilesMiddleware:
+    """
+    Serve robots.txt and sitemap.xml before the session/auth/locale stack.
+
+    Both are cached per host and do not depend on the visitor, so crawlers
+    polling them should not pay for session lookups, CSRF and auth.
+    The URLconf routes stay in place for `reverse()` and as a fallback.
+    """
+
+    def __init__(self, get_response):
+        from .views import robots_txt, sitemap_xml
+
+        self.get_response = get_response
+        self.views = {
+            "/robots.txt": robots_txt,
+            "/sitemap.xml": sitemap_xml,
+        }
+
+    def __call__(self, request):
+        view = self.views.get(request.path_info)
+        if view is not None and request.method in ("GET", "HEAD"):
+            return view(request)
+
+        return self.get_response(request)
+
+
+class PrecompressedWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise middleware that also serves the `.zst` variants written by
+    `nethz_django.storage.PrecompressedManifestStaticFilesStorage`.
+
+    WhiteNoise picks the smallest variant the client accepts, so adding zstd
+    to the candidates is all that is needed.
+    """
+
+    ENCODING_SUFFIXES = {"gzip": ".gz", "br": ".br", "zstd": ".zst"}
+
+    @classmethod
+    def is_compressed_variant(cls, path, stat_cache=None):
+        for suffix in cls.ENCODING_SUFFIXES.values():
+            if path.endswith(suffix):
+                uncompressed_path = path[: -len(suffix)]
+                if stat_cache is None:
+                    return os.path.isfile(uncompressed_path)
+                return uncompressed_path in stat_cache
+        return False
+
+    def get_static_file(self, path, url, stat_cache=None):
+        # Same as WhiteNoise.get_static_file, plus the zstd variant
+        if stat_cache is None and not os.path.exists(path):
+            raise MissingFileError(path)
+        headers = Headers([])
+        self.add_mime_headers(headers, path, url)
+        self.add_cache_headers(headers, path, url)
+        if self.allow_all_origins:
+            headers["Access-Control-Allow-Origin"] = "*"
+        if self.add_headers_function is not None:
+            self.add_headers_function(headers, path, url)
+        return StaticFile(
+            path,
+            headers.items(),
+            stat_cache=stat_cache,
+            encodings={
+                encoding: path + suffix
+                for encoding, suffix in self.ENCODING_SUFFIXES.items()
+            },
+        )
@@ -16,6 +16,7 @@ This is important for SEO endpoints like `robots.txt`/`sitemap.xml` to emit corr
 absolute URLs.
 """
 
+import tempfile
 from pathlib import Path
 
 from decouple import config
@@ -88,6 +89,10 @@ if ENVIRONMENT == "production":
     # This is needed so robots.txt can emit a correct absolute sitemap URL.
     USE_X_FORWARDED_HOST = True
 
+    # Traefik appends the client's IP to X-Forwarded-For, the rate limits
+    # (see lib.rate_limit) key on that instead of the proxy's address.
+    TRUST_X_FORWARDED_FOR = True
+
 
 # Application definition
 
@@ -115,11 +120,14 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # WhiteNoise, plus the .zst variants of nethz_django.storage
+    "nethz_django.middleware.PrecompressedWhiteNoiseMiddleware",
     # Workaround: Remove X-Robots-Tag: noindex set by Traefik/Pangolin proxy.
     # Must be early (before SEORedirectMiddleware) so it also strips the header
     # from redirect responses that return before reaching inner middleware.
     "nethz_django.middleware.RemoveNoindexHeaderMiddleware",
+    # Cached robots.txt/sitemap.xml, short-circuits before session/auth
+    "nethz_django.middleware.CrawlerFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     # SEO: 302 redirect for root URL, 301 for trailing slashes (needs session first)
     "nethz_django.middleware.SEORedirectMiddleware",
@@ -134,19 +142,36 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "nethz_django.urls"
 
-# Caching - Simple in-memory cache for template fragments
+# Caching
+# - default: in-memory cache per worker process (template fragments, rendered
+#   sitemap, ...)
+# - shared: file based, shared by all gunicorn workers of a container; used for
+#   small values that must be consistent across workers, e.g. the cache
+#   version counters from `lib.cache_versions`
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
         "LOCATION": "unique-snowflake",
-    }
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": config(
+            "SHARED_CACHE_LOCATION",
+            default=str(Path(tempfile.gettempdir()) / "nethz_cache"),
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
 }
 
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,  # Do not disable, needed for crispyforms!
+        # Explicit loaders instead of APP_DIRS (which must be False then).
+        # Compiled templates are kept per process by the cached loader and
+        # warmed up in nethz_django.wsgi (see lib.template_warmup); in
+        # development the autoreloader resets the cache on template changes.
+        "APP_DIRS": False,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.debug",
@@ -155,20 +180,58 @@ TEMPLATES = [
                 "django.contrib.messages.context_processors.messages",
                 "lib.context_processors.inject_global_context",
             ],
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        # Do not remove, needed for crispyforms!
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
         },
     },
 ]
 
 WSGI_APPLICATION = "nethz_django.wsgi.application"
 
+# Compile all templates when a worker starts (see nethz_django.wsgi)
+TEMPLATE_WARMUP = config("TEMPLATE_WARMUP", default=True, cast=bool)
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# SQLite tuning for concurrent highscore/session writes:
+# - WAL lets readers and a writer work at the same time instead of blocking.
+# - synchronous=NORMAL is safe with WAL and avoids an fsync per commit.
+# - busy_timeout makes writers wait for the lock instead of failing with
+#   "database is locked".
+# - IMMEDIATE transactions take the write lock up front, so the busy timeout
+#   applies (a deferred read->write upgrade would fail immediately).
+# - CONN_MAX_AGE reuses connections, so the PRAGMAs run once per connection
+#   and not on every request.
+SQLITE_INIT_COMMAND = ";".join(
+    [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA mmap_size=134217728",  # 128 MiB
+    ]
+)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db" / "db.sqlite3",
+        "CONN_MAX_AGE": config("DB_CONN_MAX_AGE", default=600, cast=int),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "init_command": SQLITE_INIT_COMMAND,
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 5,
+        },
     }
 }
 
@@ -228,7 +291,14 @@ if ENVIRONMENT == "production" or ENVIRONMENT == "testing":
     STATIC_ROOT = (
         BASE_DIR / "assets"
     )  # python manage.py collectstatic saves files there
-    STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+    # Hashed names plus max-level .br/.zst/.gz variants and a size report
+    # (STATICFILES_STORAGE was removed in Django 5.1, only STORAGES is read)
+    STORAGES = {
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {
+            "BACKEND": "nethz_django.storage.PrecompressedManifestStaticFilesStorage"
+        },
+    }
 
     # WhiteNoise optimization - Better caching and compression
     WHITENOISE_MAX_AGE = 31536000  # 1 year for immutable files
@@ -375,6 +445,7 @@ JAZZMIN_SETTINGS = {
         "auth.user": "fas fa-user",
         "auth.Group": "fas fa-users",
         "accounts.CustomUser": "fas fa-user-circle",
+        "accounts.OutboxEmail": "fas fa-envelope",
         "main.ExerciseSession": "fas fa-book",
         "main.WeekEntry": "fas fa-calendar-week",
     },
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import List
 
 from django.conf import settings
 from django.contrib.sitemaps import Sitemap
 from django.urls import reverse
-from django.utils import timezone, translation
+from django.utils import translation
 
-from main.models import ExerciseSession
+from lib.build_info import get_build_time
+from main.models import ExerciseSession, get_tm_pages_lastmod
 from worldle.country_data import VALID_REGIONS
 
 
@@ -68,9 +70,12 @@ class StaticViewSitemap(I18nSitemap):
         # `translation.override()` in base ensures i18n_patterns adds /de/ or /en/
         return reverse(item)
 
-    def lastmod(self, obj) -> timezone.datetime:
-        # If you have per-page update times, return them here instead.
-        return timezone.now()
+    def lastmod(self, item: str) -> datetime:
+        # Static pages only change with a deployment
+        if item == "main:technische_mechanik":
+            # ... except the TM page, which shows the latest semester
+            return get_tm_pages_lastmod()
+        return get_build_time()
 
 
 class TechnischeMechanikSitemap(I18nSitemap):
@@ -79,20 +84,21 @@ class TechnischeMechanikSitemap(I18nSitemap):
     priority = 0.7
     changefreq = "weekly"
 
-    def items(self) -> List[str]:
-        tm_sessions = ExerciseSession.objects.filter(
-            short_name__startswith="TM_"
-        ).values_list("short_name", flat=True)
+    def items(self) -> List[ExerciseSession]:
+        return list(
+            ExerciseSession.objects.filter(short_name__startswith="TM_")
+            .only("short_name", "updated_at")
+            .order_by("short_name")
+        )
 
+    def location(self, item: ExerciseSession) -> str:
         # "TM_HS24" -> "hs24"
-        semesters = sorted([s.replace("TM_", "").lower() for s in tm_sessions])
-        return semesters
-
-    def location(self, item: str) -> str:
-        return reverse("main:technische_mechanik_semester", args=[item])
+        semester = item.short_name.replace("TM_", "").lower()
+        return reverse("main:technische_mechanik_semester", args=[semester])
 
-    def lastmod(self, obj) -> timezone.datetime:
-        return timezone.now()
+    def lastmod(self, item: ExerciseSession) -> datetime:
+        # The template changes with deployments, the data with admin edits
+        return max(get_build_time(), item.updated_at)
 
 
 class WorldleRegionSitemap(I18nSitemap):
@@ -108,8 +114,8 @@ class WorldleRegionSitemap(I18nSitemap):
     def location(self, item: str) -> str:
         return reverse("worldle:capitals", args=[item])
 
-    def lastmod(self, obj) -> timezone.datetime:
-        return timezone.now()
+    def lastmod(self, item: str) -> datetime:
+        return get_build_time()
 
 
 class WorldleLanguageRegionSitemap(I18nSitemap):
@@ -125,5 +131,18 @@ class WorldleLanguageRegionSitemap(I18nSitemap):
     def location(self, item: str) -> str:
         return reverse("worldle:languages", args=[item])
 
-    def lastmod(self, obj) -> timezone.datetime:
-        return timezone.now()
+    def lastmod(self, item: str) -> datetime:
+        return get_build_time()
+
+
+# Sitemap configuration
+SITEMAPS = {
+    "static": StaticViewSitemap,
+    "technische_mechanik": TechnischeMechanikSitemap,
+    "worldle_regions": WorldleRegionSitemap,
+    "worldle_language_regions": WorldleLanguageRegionSitemap,
+}
+
+# Cache version tag of the rendered sitemap, bumped when ExerciseSession
+# rows change (see main.signals)
+SITEMAP_CACHE_TAG = "sitemap"
@@ -0,0 +1,111 @@
+import logging
+import os
+import threading
+
+from whitenoise.compress import Compressor
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from lib.compression import compress_brotli, compress_gzip, compress_zstd
+
+logger = logging.getLogger(__name__)
+
+
+class MaxLevelCompressor(Compressor):
+    """
+    WhiteNoise compressor writing `.br`, `.zst` and `.gz` variants at max level.
+
+    Only text formats are compressed (SVG, JSON, CSS, JS, ...), everything
+    else (images, fonts) is already compressed. A variant is only kept if it
+    pays off: it must be smaller by at least `MIN_SAVED_BYTES` and by
+    `1 - MAX_RATIO`. Below that, the extra file just costs a stat() per
+    worker and a branch in the negotiation without saving a network packet.
+    """
+
+    COMPRESS_EXTENSIONS = ("css", "js", "json", "map", "svg", "txt", "xml")
+    MAX_RATIO = 0.9
+    MIN_SAVED_BYTES = 512
+
+    # (content coding, file suffix, compress function), best first
+    ENCODINGS = (
+        ("br", ".br", compress_brotli),
+        ("zstd", ".zst", compress_zstd),
+        ("gzip", ".gz", compress_gzip),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.report = {}
+        self._lock = threading.Lock()
+
+    def should_compress(self, filename):
+        return filename.rpartition(".")[2].lower() in self.COMPRESS_EXTENSIONS
+
+    def compress(self, path):
+        filenames = []
+        with open(path, "rb") as f:
+            stat_result = os.fstat(f.fileno())
+            data = f.read()
+
+        sizes = {"identity": len(data)}
+        for encoding, suffix, compress in self.ENCODINGS:
+            compressed = compress(data)
+            if not self.pays_off(len(data), len(compressed)):
+                # If the best codec doesn't pay off, the others won't either
+                if not filenames:
+                    break
+                continue
+            sizes[encoding] = len(compressed)
+            filenames.append(self.write_data(path, compressed, suffix, stat_result))
+
+        with self._lock:
+            self.report[path] = sizes
+        return filenames
+
+    def pays_off(self, original_size, compressed_size):
+        saved = original_size - compressed_size
+        return (
+            saved >= self.MIN_SAVED_BYTES
+            and compressed_size <= original_size * self.MAX_RATIO
+        )
+
+
+class PrecompressedManifestStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    `CompressedManifestStaticFilesStorage` with max-level brotli/zstd/gzip
+    variants (see `MaxLevelCompressor`).
+
+    After compressing, the total size per encoding is logged (not written
+    to a file: STATIC_ROOT is served publicly).
+    """
+
+    def create_compressor(self, **kwargs):
+        # The skip list is replaced by MaxLevelCompressor's allow list
+        kwargs.pop("extensions", None)
+        return MaxLevelCompressor(**kwargs)
+
+    def compress_files(self, paths):
+        yield from super().compress_files(paths)
+        self.log_compression_report(self.compressor.report)
+
+    def log_compression_report(self, report):
+        files = list(report.values())
+        encodings = ["identity"] + [
+            encoding
+            for encoding, _suffix, _compress in self.compressor.ENCODINGS
+            if any(encoding in sizes for sizes in files)
+        ]
+        totals = dict.fromkeys(encodings, 0)
+        for sizes in files:
+            for encoding in encodings:
+                # Without a variant, clients get the identity encoding
+                totals[encoding] += sizes.get(encoding, sizes["identity"])
+        compressed = sum(len(sizes) > 1 for sizes in files)
+
+        logger.info(
+            "Precompressed %d of %d files: %s",
+            compressed,
+            len(files),
+            ", ".join(
+                f"{encoding} {size / 1024:.0f} KB" for encoding, size in totals.items()
+            ),
+        )
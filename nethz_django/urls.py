@@ -17,24 +17,11 @@ Including another URLconf
 
 from django.conf.urls.i18n import i18n_patterns
 from django.contrib import admin
-from django.contrib.sitemaps.views import sitemap
 from django.urls import include, path
 
-from .sitemaps import (
-    StaticViewSitemap,
-    TechnischeMechanikSitemap,
-    WorldleLanguageRegionSitemap,
-    WorldleRegionSitemap,
-)
-from .views import robots_txt
+from worldle.views import country_dataset
 
-# Sitemap configuration
-sitemaps = {
-    "static": StaticViewSitemap,
-    "technische_mechanik": TechnischeMechanikSitemap,
-    "worldle_regions": WorldleRegionSitemap,
-    "worldle_language_regions": WorldleLanguageRegionSitemap,
-}
+from .views import robots_txt, sitemap_xml
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -42,11 +29,16 @@ urlpatterns = [
     # SEO URLs
     path(
         "sitemap.xml",
-        sitemap,
-        {"sitemaps": sitemaps},
+        sitemap_xml,
         name="django.contrib.sitemaps.views.sitemap",
     ),
     path("robots.txt", robots_txt, name="robots_txt"),
+    # Worldle offline support, shared by all languages
+    path(
+        "worldle/dataset/<str:version>.json",
+        country_dataset,
+        name="worldle_dataset",
+    ),
 ]
 
 urlpatterns += i18n_patterns(
@@ -1,14 +1,18 @@
-from django.http import HttpResponse
+from django.contrib.sitemaps.views import sitemap
+from django.core.cache import cache
+from django.utils.http import parse_http_date_safe
 
+from lib.cache_versions import get_cache_version
+from lib.compression import build_precompressed, serve_precompressed
+
+from .sitemaps import SITEMAP_CACHE_TAG, SITEMAPS
+
+ROBOTS_TXT_MAX_AGE = 86400  # 1 day
 
-def robots_txt(request):
-    """
-    Generiert robots.txt dynamisch mit korrekter Domain.
-    """
-    # Bestimme die korrekte Domain
-    scheme = "https" if request.is_secure() else "http"
-    domain = request.get_host()
-    sitemap_url = f"{scheme}://{domain}/sitemap.xml"
+
+def render_robots_txt(scheme, host):
+    """robots.txt content, including the absolute sitemap URL for the host."""
+    sitemap_url = f"{scheme}://{host}/sitemap.xml"
 
     lines = [
         "User-agent: *",
@@ -31,4 +35,54 @@ def robots_txt(request):
         "Allow: /en/technische-mechanik/",
     ]
 
-    return HttpResponse("\n".join(lines), content_type="text/plain")
+    return "\n".join(lines)
+
+
+def robots_txt(request):
+    """
+    Serve robots.txt, rendered once per (scheme, host).
+
+    The content only changes with a deployment, which also starts with an
+    empty per-process cache.
+    """
+    # Bestimme die korrekte Domain
+    scheme = "https" if request.is_secure() else "http"
+    host = request.get_host()
+    cache_key = f"robots_txt:{scheme}://{host}"
+
+    entry = cache.get(cache_key)
+    if entry is None:
+        entry = build_precompressed(
+            render_robots_txt(scheme, host).encode(),
+            content_type="text/plain",
+        )
+        cache.set(cache_key, entry, timeout=None)
+
+    return serve_precompressed(request, entry, max_age=ROBOTS_TXT_MAX_AGE)
+
+
+def sitemap_xml(request):
+    """
+    Serve sitemap.xml from a precompressed cache.
+
+    The XML is rendered once per host and sitemap version; crawlers then get
+    the cached gzip/brotli bytes with an ETag. The version is bumped when
+    ExerciseSession rows change (see main.signals).
+    """
+    scheme = "https" if request.is_secure() else "http"
+    host = request.get_host()
+    cache_key = f"sitemap:{get_cache_version(SITEMAP_CACHE_TAG)}:{scheme}://{host}"
+
+    entry = cache.get(cache_key)
+    if entry is None:
+        response = sitemap(request, sitemaps=SITEMAPS)
+        response.render()
+        entry = build_precompressed(
+            response.content,
+            content_type=response["Content-Type"],
+            headers={"X-Robots-Tag": response["X-Robots-Tag"]},
+            last_modified=parse_http_date_safe(response.get("Last-Modified", "")),
+        )
+        cache.set(cache_key, entry, timeout=None)
+
+    return serve_precompressed(request, entry)
@@ -9,8 +9,16 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nethz_django.settings")
 
 application = get_wsgi_application()
+
+# Gunicorn imports this module in every worker before it accepts requests,
+# so the first visitors don't pay for compiling the templates
+if settings.TEMPLATE_WARMUP:
+    from lib.template_warmup import warmup_templates
+
+    warmup_templates()
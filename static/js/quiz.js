@@ -40,8 +40,7 @@ function checkAnswer(userAnswerElement, correctAnswer) {
     userAnswerElement.classList.add("is-valid");
 
     setTimeout(function () {
-      location.reload();
-      userAnswerElement.value = "";
+      showNextQuestion(userAnswerElement);
     }, 1000);
   } else if (isPartialCorrect && !hasWrongAnswer) {
     userAnswerElement.classList.add("is-partial-correct");
@@ -50,11 +49,142 @@ function checkAnswer(userAnswerElement, correctAnswer) {
   }
 }
 
-// Add event listener for Enter key
+// Add event listener for Enter key, `correctAnswer` may be a getter function
 function addEnterKeyListener(userAnswerElement, correctAnswer) {
   userAnswerElement.addEventListener("keyup", function (event) {
     if (event.key === "Enter") {
-      checkAnswer(userAnswerElement, correctAnswer);
+      checkAnswer(
+        userAnswerElement,
+        typeof correctAnswer === "function" ? correctAnswer() : correctAnswer,
+      );
+    }
+  });
+}
+
+// Fetch the flags of the next rounds now, so they show up instantly
+function prefetchFlags(urls) {
+  (urls || []).forEach((url) => {
+    new Image().src = url;
+  });
+}
+
+/* In-place practice rounds (capitals, languages).
+  The practice pages call initPractice(); after a correct answer the next
+  country is drawn from the versioned country dataset (worldle/dataset.py),
+  which is fetched once and kept by the service worker, instead of reloading
+  the page. If the dataset can't be loaded we ask the small JSON API
+  (questionUrl) for the next country, and only reload if that fails too. */
+let practice = null;
+let datasetPromise = null;
+
+function initPractice(options) {
+  // options: datasetUrl, serviceWorkerUrl, questionUrl, region, field, cca3, answer
+  practice = options;
+  if ("serviceWorker" in navigator && options.serviceWorkerUrl) {
+    // Scoped to the directory of the worker, /<language>/worldle/
+    navigator.serviceWorker.register(options.serviceWorkerUrl).catch(() => {});
+    // Remove the worker previously registered for the whole site
+    navigator.serviceWorker
+      .getRegistration("/")
+      .then((registration) => {
+        if (registration && registration.scope === location.origin + "/") {
+          registration.unregister();
+        }
+      })
+      .catch(() => {});
+  }
+}
+
+function loadDataset() {
+  if (datasetPromise === null) {
+    datasetPromise = fetch(practice.datasetUrl).then((response) => {
+      if (!response.ok) {
+        throw new Error(response.statusText);
+      }
+      return response.json();
+    });
+    // Retry on the next question instead of caching the failure
+    datasetPromise.catch(() => {
+      datasetPromise = null;
+    });
+  }
+  return datasetPromise;
+}
+
+// Same result as Django's |title filter
+function titleCase(text) {
+  return text
+    .toLowerCase()
+    .replace(
+      /(^|[^\p{L}])(\p{L})/gu,
+      (match, before, letter) => before + letter.toUpperCase(),
+    )
+    .replace(/([a-z])'([A-Z])/g, (match) => match.toLowerCase())
+    .replace(/\d([A-Z])/g, (match) => match.toLowerCase());
+}
+
+function drawPracticeCountry(dataset) {
+  const column = Object.fromEntries(
+    dataset.fields.map((field, index) => [field, index]),
+  );
+  const candidates = dataset.countries.filter(
+    (country) =>
+      (practice.region === "worldwide" ||
+        country[column.region] === practice.region) &&
+      country[column[practice.field]] !== "" &&
+      country[column.cca3] !== practice.cca3,
+  );
+  const country = candidates[Math.floor(Math.random() * candidates.length)];
+  return {
+    cca3: country[column.cca3],
+    name: country[column.name],
+    flag: country[column.flag],
+    solution: country[column[practice.field]],
+  };
+}
+
+function fetchPracticeQuestion() {
+  const url = new URL(practice.questionUrl, location.href);
+  url.searchParams.set("exclude", practice.cca3);
+  return fetch(url).then((response) => {
+    if (!response.ok) {
+      throw new Error(response.statusText);
     }
+    return response.json();
   });
 }
+
+function showNextQuestion(userAnswerElement) {
+  if (practice === null) {
+    location.reload();
+    return;
+  }
+
+  loadDataset()
+    .then(drawPracticeCountry)
+    .catch(fetchPracticeQuestion)
+    .then((country) => {
+      practice.cca3 = country.cca3;
+      practice.answer = country.solution.toLowerCase();
+
+      document.getElementById("countryName").textContent = titleCase(
+        country.name,
+      );
+      document.getElementById("countryFlag").src = country.flag;
+      const solutionElement = document.getElementById("solution");
+      if (solutionElement) {
+        solutionElement.textContent = country.solution;
+      }
+      const collapseElement = document.getElementById("collapseOne");
+      if (collapseElement && window.bootstrap) {
+        bootstrap.Collapse.getOrCreateInstance(collapseElement, {
+          toggle: false,
+        }).hide();
+      }
+
+      userAnswerElement.value = "";
+      userAnswerElement.classList.remove("is-valid");
+      userAnswerElement.focus();
+    })
+    .catch(() => location.reload());
+}
@@ -0,0 +1,111 @@
+/* Worldle service worker, rendered by worldle.views.service_worker and
+ * scoped to the Worldle pages of one language (/<language>/worldle/).
+ *
+ * - Static assets and the versioned country dataset: cache first
+ *   (their URLs change with their content). Without hashed static file
+ *   names (development), static assets are fetched network first.
+ * - Practice pages: network first, falling back to the last cached copy,
+ *   so practice keeps working offline.
+ * Everything else goes straight to the network. Apart from the precached
+ * URLs, the cache keeps the MAX_ENTRIES most recently stored responses.
+ */
+{% load static %}const CACHE_PREFIX = "worldle-";
+const CACHE_NAME = CACHE_PREFIX + "{{ cache_version|escapejs }}";
+const PRECACHE_URLS = [
+  {% for url in precache_urls %}"{{ url|escapejs }}",
+  {% endfor %}
+];
+const PRECACHED = new Set(
+  PRECACHE_URLS.map((url) => new URL(url, self.location.origin).href),
+);
+const MAX_ENTRIES = 200;
+const STATIC_PREFIX = "{% get_static_prefix %}";
+const HASHED_STATIC = {{ hashed_static|yesno:"true,false" }};
+const PRACTICE_PAGE = /^\/[a-z]{2}\/worldle\/(capitals|languages)\/[a-z]+\/$/;
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches
+      .open(CACHE_NAME)
+      .then((cache) => cache.addAll(PRECACHE_URLS))
+      .then(() => self.skipWaiting()),
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  // Drop the caches of previous deployments / datasets
+  event.waitUntil(
+    caches
+      .keys()
+      .then((names) =>
+        Promise.all(
+          names
+            .filter((name) => name.startsWith(CACHE_PREFIX) && name !== CACHE_NAME)
+            .map((name) => caches.delete(name)),
+        ),
+      )
+      .then(() => self.clients.claim()),
+  );
+});
+
+// Store a response and evict the oldest entries beyond MAX_ENTRIES
+// (Cache.keys() lists them in insertion order)
+function store(cache, request, response) {
+  return cache
+    .put(request, response)
+    .then(() => cache.keys())
+    .then((requests) => {
+      const evictable = requests.filter((cached) => !PRECACHED.has(cached.url));
+      return Promise.all(
+        evictable
+          .slice(0, Math.max(0, evictable.length - MAX_ENTRIES))
+          .map((cached) => cache.delete(cached)),
+      );
+    });
+}
+
+function cacheFirst(request) {
+  return caches.open(CACHE_NAME).then((cache) =>
+    cache.match(request).then(
+      (cached) =>
+        cached ||
+        fetch(request).then((response) => {
+          if (response.ok) {
+            store(cache, request, response.clone());
+          }
+          return response;
+        }),
+    ),
+  );
+}
+
+function networkFirst(request) {
+  return caches.open(CACHE_NAME).then((cache) =>
+    fetch(request)
+      .then((response) => {
+        if (response.ok) {
+          store(cache, request, response.clone());
+        }
+        return response;
+      })
+      .catch(() =>
+        cache.match(request).then((cached) => cached || Response.error()),
+      ),
+  );
+}
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (request.method !== "GET" || url.origin !== self.location.origin) {
+    return;
+  }
+
+  if (url.pathname.startsWith("/worldle/dataset/")) {
+    event.respondWith(cacheFirst(request));
+  } else if (url.pathname.startsWith(STATIC_PREFIX)) {
+    event.respondWith(HASHED_STATIC ? cacheFirst(request) : networkFirst(request));
+  } else if (request.mode === "navigate" && PRACTICE_PAGE.test(url.pathname)) {
+    event.respondWith(networkFirst(request));
+  }
+});
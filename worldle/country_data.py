@@ -3,7 +3,7 @@ import csv
 import random
 from pathlib import Path
 
-from django.templatetags.static import static
+from worldle.flags import get_flag_url
 
 
 FILE_PATH = Path(__file__).resolve().parent
@@ -35,6 +35,7 @@ class CountryHeader:
 class CountryData:
     __instance = None
     __CSV_ENTRIES = None
+    __FILTERED_ENTRIES = {}
     __COUNTRIES_CSV_FILE_PATH = FILE_PATH / "data" / "countries.csv"
 
     def __new__(cls):
@@ -53,7 +54,8 @@ class CountryData:
     def clean_country_data(cls, country):
         return {
             "name": country[CountryHeader.common_name].strip(),
-            "image_url": static(f"worldle/{country[CountryHeader.cca3].lower()}.svg"),
+            # Points into the region's sprite sheet once `build_flags` ran
+            "image_url": get_flag_url(country[CountryHeader.cca3].strip().lower()),
         }
 
     @classmethod
@@ -77,21 +79,42 @@ class CountryData:
         return dict(zip(CHOICES_KEYS, answers))
 
     @classmethod
-    def get_random_filtered_entry(cls, region, header_field: CountryHeader):
-        entries = deepcopy(cls.get_csv_entries())
+    def get_filtered_entries(cls, region, header_field: CountryHeader):
+        """Entries of `region` with a non-empty `header_field`, indexed once."""
+        region = region.strip().lower()
+        key = (region, header_field)
+        if key not in cls.__FILTERED_ENTRIES:
+            entries = cls.get_csv_entries()
+
+            if region != DEFAULT_REGION:
+                entries = [
+                    entry
+                    for entry in entries
+                    if entry[CountryHeader.region].strip().lower() == region
+                ]
+
+            # Filter entries with no specified field
+            cls.__FILTERED_ENTRIES[key] = tuple(
+                entry for entry in entries if entry[header_field].strip()
+            )
+        return cls.__FILTERED_ENTRIES[key]
 
-        if region != DEFAULT_REGION:
+    @classmethod
+    def get_random_filtered_entry(
+        cls, region, header_field: CountryHeader, exclude: str | None = None
+    ):
+        entries = cls.get_filtered_entries(region, header_field)
+
+        # Don't ask for the same country twice in a row
+        if exclude:
+            exclude = exclude.strip().lower()
             entries = [
                 entry
                 for entry in entries
-                if entry[CountryHeader.region].strip().lower() == region.strip().lower()
-            ]
+                if entry[CountryHeader.cca3].strip().lower() != exclude
+            ] or entries
 
-        # Filter entries with no specified field
-        entries = [entry for entry in entries if entry[header_field].strip()]
-        random_row = random.choice(entries)
-
-        return random_row
+        return deepcopy(random.choice(entries))
 
     @classmethod
     def get_random_countries(
@@ -116,7 +139,10 @@ class CountryData:
 
     @classmethod
     def get_random_items(
-        cls, number_of_items: int, header_field: CountryHeader, exclude: str = None
+        cls,
+        number_of_items: int,
+        header_field: CountryHeader,
+        exclude: str | None = None,
     ) -> list:
         items = []
         for entry in cls.get_csv_entries():
@@ -0,0 +1,71 @@
+"""
+Versioned country dataset for client-side practice rounds.
+
+The practice modes (capitals, languages) only need a handful of columns of
+`countries.csv`. Those are served once as a compact JSON document whose URL
+contains a content hash, so it can be cached forever by the browser and the
+service worker (`templates/worldle/sw.js`); `quiz.js` then draws every
+further question locally without asking the server.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+
+from django.urls import reverse
+
+from lib.compression import build_precompressed
+
+from .country_data import CountryData, CountryHeader
+from .flags import get_flag_url
+
+# Column order of the rows in the "countries" list
+DATASET_FIELDS = ("cca3", "name", "region", "capital", "languages", "flag")
+
+
+def _clean_list(value):
+    return ", ".join(item.strip() for item in value.strip().split(",") if item.strip())
+
+
+def build_country_dataset():
+    """Return the dataset as {"version", "fields", "countries"}."""
+    countries = []
+    for entry in CountryData().get_csv_entries():
+        cca3 = entry[CountryHeader.cca3].strip().lower()
+        countries.append(
+            [
+                cca3,
+                entry[CountryHeader.common_name].strip(),
+                entry[CountryHeader.region].strip().lower(),
+                _clean_list(entry[CountryHeader.capital]),
+                _clean_list(entry[CountryHeader.languages]),
+                get_flag_url(cca3),
+            ]
+        )
+
+    payload = json.dumps(
+        {"fields": DATASET_FIELDS, "countries": countries},
+        ensure_ascii=False,
+        separators=(",", ":"),
+        sort_keys=True,
+    )
+    version = hashlib.sha256(payload.encode()).hexdigest()[:12]
+    return {"version": version, "fields": DATASET_FIELDS, "countries": countries}
+
+
+@lru_cache(maxsize=1)
+def get_dataset_entry():
+    """The dataset as `build_precompressed` entry, plus its version."""
+    dataset = build_country_dataset()
+    content = json.dumps(dataset, ensure_ascii=False, separators=(",", ":")).encode()
+    return dataset["version"], build_precompressed(
+        content, content_type="application/json"
+    )
+
+
+def get_dataset_version():
+    return get_dataset_entry()[0]
+
+
+def get_dataset_url():
+    return reverse("worldle_dataset", args=[get_dataset_version()])
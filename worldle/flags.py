@@ -0,0 +1,429 @@
+"""
+Minification and sprite sheets for the flags in `static/worldle/*.svg`.
+
+`minify_svg` strips editor metadata, rounds numbers and merges adjacent
+paths. `build_sprite` stacks the minified flags of a region into one SVG with
+a `<view>` per flag, so `<img src="sprite-europe.svg#che">` shows a single flag
+while the whole region is downloaded (and cached) only once.
+"""
+
+import json
+import re
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from pathlib import Path
+
+from django.templatetags.static import static
+
+FLAGS_DIR = Path(__file__).resolve().parent.parent / "static" / "worldle" / "flags"
+MANIFEST_NAME = "manifest.json"
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+
+# Namespaces only used by editors (Inkscape, Sodipodi) and for metadata
+EDITOR_NAMESPACES = {
+    "http://creativecommons.org/ns#",
+    "http://purl.org/dc/elements/1.1/",
+    "http://www.inkscape.org/namespaces/inkscape",
+    "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd",
+}
+METADATA_TAGS = {"metadata", "title", "desc"}
+TEXT_TAGS = {"text", "tspan", "textPath", "style"}
+
+# Attributes holding numbers/coordinates that are safe to round
+NUMERIC_ATTRIBUTES = {
+    "d",
+    "points",
+    "transform",
+    "gradientTransform",
+    "patternTransform",
+    "x",
+    "y",
+    "x1",
+    "y1",
+    "x2",
+    "y2",
+    "cx",
+    "cy",
+    "fx",
+    "fy",
+    "r",
+    "rx",
+    "ry",
+    "width",
+    "height",
+    "stroke-width",
+}
+# Paths with one of these can not be merged without changing the rendering
+UNMERGEABLE_ATTRIBUTES = {
+    "id",
+    "opacity",
+    "fill-opacity",
+    "stroke",
+    "stroke-opacity",
+    "style",
+    "clip-path",
+    "mask",
+    "filter",
+    "marker-start",
+    "marker-mid",
+    "marker-end",
+}
+
+NUMBER_PATTERN = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+PATH_TOKEN_PATTERN = re.compile(
+    r"[MmZzLlHhVvCcSsQqTtAa]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+)
+PATH_PARAMETERS = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2}
+URL_REFERENCE_PATTERN = re.compile(r"url\(\s*['\"]?#([^)'\"\s]+)['\"]?\s*\)")
+
+# Width of every flag in a sprite and the gap between flags (sprite units)
+SPRITE_FLAG_WIDTH = 300
+SPRITE_GAP = 4
+
+
+def _local_name(tag):
+    return tag.rpartition("}")[2]
+
+
+def _namespace(name):
+    return name[1:].partition("}")[0] if name.startswith("{") else ""
+
+
+def format_number(value, precision):
+    """Shortest representation of `value` with `precision` significant digits."""
+    text = f"{float(value):.{precision}g}"
+    if "e" in text:
+        return text
+    if text.startswith("0."):
+        text = text[1:]
+    elif text.startswith("-0."):
+        text = "-" + text[2:]
+    return "0" if text in ("-0", "") else text
+
+
+def round_numbers(value, precision):
+    return NUMBER_PATTERN.sub(
+        lambda match: format_number(match.group(), precision), value
+    )
+
+
+def path_bbox(d):
+    """
+    Bounding box of the path data `d` (control points included).
+
+    Returns None for arcs and anything unparsable; callers treat that as
+    "unknown" and leave the path alone.
+    """
+    tokens = PATH_TOKEN_PATTERN.findall(d)
+    x = y = start_x = start_y = 0.0
+    xs, ys = [], []
+    command = None
+    i = 0
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            command = tokens[i]
+            i += 1
+        elif command is None:
+            return None
+
+        upper = command.upper()
+        relative = command.islower()
+        if upper == "Z":
+            x, y = start_x, start_y
+            if i < len(tokens) and not tokens[i].isalpha():
+                return None
+            continue
+        if upper not in PATH_PARAMETERS:
+            return None
+
+        count = PATH_PARAMETERS[upper]
+        values = tokens[i : i + count]
+        if len(values) < count or any(value.isalpha() for value in values):
+            return None
+        values = [float(value) for value in values]
+        i += count
+
+        if upper == "H":
+            x = values[0] + (x if relative else 0)
+        elif upper == "V":
+            y = values[0] + (y if relative else 0)
+        else:
+            base_x, base_y = (x, y) if relative else (0, 0)
+            for px, py in zip(values[::2], values[1::2]):
+                xs.append(px + base_x)
+                ys.append(py + base_y)
+            x, y = xs[-1], ys[-1]
+        xs.append(x)
+        ys.append(y)
+
+        if upper == "M":
+            start_x, start_y = x, y
+            # Further coordinate pairs after a moveto are implicit linetos
+            command = "l" if relative else "L"
+
+    if not xs:
+        return None
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def _absolute_start(d):
+    """
+    Path data `d` starting with an absolute moveto.
+
+    The first moveto of a path is absolute even if written as `m`, which no
+    longer holds once the path is appended to another one. Coordinate pairs
+    following it are relative linetos, so those get an explicit `l`.
+    """
+    match = re.match(
+        rf"\s*m\s*({NUMBER_PATTERN.pattern})[\s,]*({NUMBER_PATTERN.pattern})(.*)",
+        d,
+        re.DOTALL,
+    )
+    if match is None:
+        return d.lstrip()
+    x, y, rest = match.groups()
+    rest = rest.lstrip(" ,\t\n")
+    if rest[:1] and not rest[:1].isalpha():
+        rest = "l" + rest
+    return f"M{x} {y}{rest}"
+
+
+def _boxes_overlap(a, b):
+    return not (a[2] < b[0] or b[2] < a[0] or a[3] < b[1] or b[3] < a[1])
+
+
+def _merge_paths(parent):
+    """
+    Merge runs of sibling paths with identical attributes into one path.
+
+    Only paths whose bounding boxes don't overlap are merged: overlapping
+    subpaths could cancel each other out under the fill rule.
+    """
+    children = list(parent)
+    merged = []
+    for child in children:
+        previous = merged[-1] if merged else None
+        mergeable = (
+            _local_name(child.tag) == "path"
+            and len(child) == 0
+            and not UNMERGEABLE_ATTRIBUTES & set(child.attrib)
+            and child.get("d")
+        )
+        if (
+            mergeable
+            and previous is not None
+            and _local_name(previous[0].tag) == "path"
+            and previous[1] is not None
+            and {k: v for k, v in previous[0].attrib.items() if k != "d"}
+            == {k: v for k, v in child.attrib.items() if k != "d"}
+        ):
+            bbox = path_bbox(child.get("d"))
+            if bbox is not None and not any(
+                _boxes_overlap(bbox, other) for other in previous[1]
+            ):
+                d = _absolute_start(child.get("d"))
+                previous[0].set("d", f"{previous[0].get('d')}{d}")
+                previous[1].append(bbox)
+                parent.remove(child)
+                continue
+
+        bbox = path_bbox(child.get("d")) if mergeable else None
+        merged.append((child, [bbox] if bbox is not None else None))
+
+
+def _clean(element, precision):
+    for child in list(element):
+        if not isinstance(child.tag, str):
+            element.remove(child)
+            continue
+        if (
+            _namespace(child.tag) in EDITOR_NAMESPACES
+            or _local_name(child.tag) in METADATA_TAGS
+        ):
+            element.remove(child)
+            continue
+        _clean(child, precision)
+
+    for name in list(element.attrib):
+        if _namespace(name) in EDITOR_NAMESPACES:
+            del element.attrib[name]
+        elif name in NUMERIC_ATTRIBUTES:
+            element.set(name, round_numbers(element.get(name), precision))
+
+    if _local_name(element.tag) not in TEXT_TAGS:
+        if element.text is not None and not element.text.strip():
+            element.text = None
+        for child in element:
+            if child.tail is not None and not child.tail.strip():
+                child.tail = None
+
+    # Unwrap groups without attributes and drop empty containers
+    index = 0
+    while index < len(element):
+        child = element[index]
+        name = _local_name(child.tag)
+        if name == "g" and not child.attrib and not (child.text or "").strip():
+            element.remove(child)
+            for offset, grandchild in enumerate(list(child)):
+                element.insert(index + offset, grandchild)
+            continue
+        if name in ("g", "defs") and len(child) == 0 and not child.text:
+            element.remove(child)
+            continue
+        index += 1
+
+    _merge_paths(element)
+
+
+def _referenced_ids(root):
+    referenced = set()
+    for element in root.iter():
+        for name, value in element.attrib.items():
+            if _local_name(name) == "href" and value[:1] == "#":
+                referenced.add(value[1:])
+            referenced.update(URL_REFERENCE_PATTERN.findall(value))
+        if _local_name(element.tag) == "style" and element.text:
+            referenced.update(re.findall(r"#([\w.-]+)", element.text))
+    return referenced
+
+
+def _remove_unused_ids(root):
+    referenced = _referenced_ids(root)
+    for element in root.iter():
+        if element.get("id") is not None and element.get("id") not in referenced:
+            del element.attrib["id"]
+
+
+def _serialize(root):
+    return ET.tostring(root, encoding="unicode").replace(" />", "/>")
+
+
+def minify_svg(content, precision=5):
+    """
+    Return a minified version of the SVG document `content`.
+
+    Numbers are rounded to `precision` significant digits (not decimal
+    places: some flags draw in a 0..1 coordinate system and scale up).
+    """
+    root = ET.fromstring(content)
+    # Before cleaning, so paths that lose their id can be merged
+    _remove_unused_ids(root)
+    root.attrib.pop("version", None)
+    _clean(root, precision)
+    return _serialize(root)
+
+
+def flag_size(root):
+    """(x, y, width, height) of a flag from its viewBox or width/height."""
+    view_box = root.get("viewBox")
+    if view_box:
+        x, y, width, height = (float(v) for v in re.split(r"[\s,]+", view_box.strip()))
+        return x, y, width, height
+    width = float(root.get("width", "").removesuffix("px") or 0)
+    height = float(root.get("height", "").removesuffix("px") or 0)
+    if not width or not height:
+        raise ValueError("SVG has neither a viewBox nor a width and height")
+    return 0.0, 0.0, width, height
+
+
+def _prefix_ids(root, prefix):
+    """Prefix all ids in `root` (and references to them) with `prefix`."""
+    ids = {element.get("id") for element in root.iter() if element.get("id")}
+    if not ids:
+        return
+
+    def replace_url(match):
+        name = match.group(1)
+        return f"url(#{prefix}{name})" if name in ids else match.group()
+
+    for element in root.iter():
+        for name, value in element.attrib.items():
+            if name == "id":
+                element.set(name, prefix + value)
+            elif _local_name(name) == "href" and value[1:] in ids and value[:1] == "#":
+                element.set(name, f"#{prefix}{value[1:]}")
+            elif "url(" in value:
+                element.set(name, URL_REFERENCE_PATTERN.sub(replace_url, value))
+        if _local_name(element.tag) == "style" and element.text:
+            text = URL_REFERENCE_PATTERN.sub(replace_url, element.text)
+            for name in ids:
+                text = re.sub(rf"#{re.escape(name)}\b", f"#{prefix}{name}", text)
+            element.text = text
+
+
+def build_sprite(flags):
+    """
+    Stack flags into one SVG sprite.
+
+    `flags` maps cca3 codes to (minified) SVG documents. Returns the sprite
+    document and {cca3: (x, y, width, height)} of each flag's `<view>`.
+    """
+    sprite = ET.Element(f"{{{SVG_NS}}}svg")
+    views = []
+    positions = {}
+    y = 0
+    for cca3, content in flags.items():
+        root = ET.fromstring(content)
+        _x, _y, width, height = flag_size(root)
+        scaled_height = round(SPRITE_FLAG_WIDTH * height / width, 2)
+        _prefix_ids(root, f"{cca3}-")
+
+        # Nested <svg>: the flag keeps its own viewBox and is scaled into place
+        if not root.get("viewBox"):
+            root.set(
+                "viewBox", f"0 0 {format_number(width, 6)} {format_number(height, 6)}"
+            )
+        root.set("x", "0")
+        root.set("y", format_number(y, 6))
+        root.set("width", str(SPRITE_FLAG_WIDTH))
+        root.set("height", format_number(scaled_height, 6))
+        sprite.append(root)
+
+        positions[cca3] = (0, y, SPRITE_FLAG_WIDTH, scaled_height)
+        view = ET.Element(f"{{{SVG_NS}}}view")
+        view.set("id", cca3)
+        view.set(
+            "viewBox",
+            f"0 {format_number(y, 6)} {SPRITE_FLAG_WIDTH} "
+            f"{format_number(scaled_height, 6)}",
+        )
+        views.append(view)
+        y = round(y + scaled_height + SPRITE_GAP, 2)
+
+    for view in views:
+        sprite.insert(0, view)
+    sprite.set(
+        "viewBox", f"0 0 {SPRITE_FLAG_WIDTH} {format_number(max(y - SPRITE_GAP, 0), 6)}"
+    )
+    return _serialize(sprite), positions
+
+
+@lru_cache(maxsize=1)
+def load_flag_manifest():
+    """
+    The manifest written by `manage.py build_flags`, or {} if the flags
+    haven't been built (then the original SVGs are used).
+    """
+    try:
+        with open(FLAGS_DIR / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def get_flag_url(cca3):
+    """
+    URL of a flag: a `<view>` inside its region's sprite if available,
+    otherwise the minified or the original SVG.
+    """
+    flag = load_flag_manifest().get("flags", {}).get(cca3)
+    if flag is None:
+        return static(f"worldle/{cca3}.svg")
+    if flag.get("sprite"):
+        return f"{static(flag['sprite'])}#{cca3}"
+    return static(flag["url"])
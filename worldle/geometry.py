@@ -0,0 +1,415 @@
+"""
+GeoJSON -> simplified, quantized TopoJSON conversion for the country shapes in
+`static/worldle/*.geo.json`.
+
+Pipeline (same order as topojson's `geo2topo | toposimplify | topoquantize`):
+1. quantize all coordinates onto an integer grid,
+2. build the topology: cut rings at junctions and share identical arcs,
+3. simplify every arc (endpoints are fixed, so shared borders stay shared),
+   then give the arcs of rings that collapsed their points back,
+4. delta-encode the arcs.
+"""
+
+import heapq
+import itertools
+import math
+
+ALGORITHMS = ("visvalingam", "douglas-peucker")
+
+# A closed ring needs 3 distinct points plus the closing point
+MIN_RING_POINTS = 4
+
+
+class Transform:
+    """Quantization grid of a topology (TopoJSON `transform`)."""
+
+    def __init__(self, bbox, quantization):
+        x0, y0, x1, y1 = bbox
+        self.translate = (x0, y0)
+        self.scale = (
+            (x1 - x0) / (quantization - 1) if x1 > x0 else 1,
+            (y1 - y0) / (quantization - 1) if y1 > y0 else 1,
+        )
+
+    def quantize(self, point):
+        return (
+            round((point[0] - self.translate[0]) / self.scale[0]),
+            round((point[1] - self.translate[1]) / self.scale[1]),
+        )
+
+    def to_json(self):
+        return {"scale": list(self.scale), "translate": list(self.translate)}
+
+
+def _polygons(geometry):
+    """Polygons of a (Multi)Polygon geometry as lists of rings."""
+    if not geometry:
+        return []
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    raise ValueError(f"Unsupported geometry type: {geometry['type']}")
+
+
+def _bbox(features):
+    xs, ys = [], []
+    for feature in features:
+        for polygon in _polygons(feature.get("geometry")):
+            for ring in polygon:
+                for x, y, *_rest in ring:
+                    xs.append(x)
+                    ys.append(y)
+    if not xs:
+        return (0, 0, 0, 0)
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def _quantize_ring(ring, transform):
+    """Quantize a ring and drop points that collapsed onto their predecessor."""
+    points = []
+    for point in ring:
+        quantized = transform.quantize(point)
+        if not points or quantized != points[-1]:
+            points.append(quantized)
+    if points and points[0] != points[-1]:
+        points.append(points[0])
+    return points
+
+
+def _find_junctions(rings):
+    """
+    Points where rings meet or diverge.
+
+    A point that is always visited between the same two neighbours lies on
+    the inside of a (possibly shared) line; a point with differing neighbours
+    is where a shared border starts or ends.
+    """
+    neighbours = {}
+    junctions = set()
+    for ring in rings:
+        # Closed ring: the last point repeats the first one
+        points = ring[:-1]
+        count = len(points)
+        for i, point in enumerate(points):
+            pair = frozenset((points[i - 1], points[(i + 1) % count]))
+            seen = neighbours.setdefault(point, pair)
+            if seen != pair:
+                junctions.add(point)
+    return junctions
+
+
+def _rotate_to_min(points):
+    """Rotate a closed ring (without closing point) to start at its min point."""
+    start = points.index(min(points))
+    return points[start:] + points[:start]
+
+
+class _ArcIndex:
+    """Deduplicates arcs; a reversed match is referenced as `~index`."""
+
+    def __init__(self):
+        self.arcs = []
+        self._index = {}
+
+    def add(self, arc, closed=False):
+        if closed:
+            ring = arc[:-1]
+            forward = _rotate_to_min(ring)
+            backward = _rotate_to_min(ring[::-1])
+            key_forward = ("ring", tuple(forward))
+            key_backward = ("ring", tuple(backward))
+            arc = forward + forward[:1]
+        else:
+            key_forward = tuple(arc)
+            key_backward = tuple(arc[::-1])
+
+        if key_forward in self._index:
+            return self._index[key_forward]
+        if key_backward in self._index:
+            return ~self._index[key_backward]
+
+        self._index[key_forward] = len(self.arcs)
+        self.arcs.append(arc)
+        return len(self.arcs) - 1
+
+
+def _cut_ring(ring, junctions):
+    """Split a closed ring into arcs at its junctions."""
+    points = ring[:-1]
+    cut_at = [i for i, point in enumerate(points) if point in junctions]
+    if not cut_at:
+        return [(ring, True)]
+
+    start = cut_at[0]
+    rotated = points[start:] + points[:start]
+    rotated.append(rotated[0])
+    cuts = [i for i, point in enumerate(rotated) if point in junctions]
+
+    arcs = []
+    for begin, end in itertools.pairwise(cuts):
+        arcs.append((rotated[begin : end + 1], False))
+    return arcs
+
+
+def _triangle_area(a, b, c):
+    return abs((b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1])) / 2
+
+
+def _segment_distance(point, start, end):
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    if dx == 0 and dy == 0:
+        return math.hypot(point[0] - start[0], point[1] - start[1])
+    t = ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / (dx * dx + dy * dy)
+    t = max(0, min(1, t))
+    return math.hypot(point[0] - start[0] - t * dx, point[1] - start[1] - t * dy)
+
+
+def douglas_peucker(points, tolerance, min_points=2):
+    """Indices of `points` kept by Douglas-Peucker with the given tolerance."""
+    if len(points) <= min_points:
+        return list(range(len(points)))
+
+    # Significance of a point: its distance when it was chosen as split point,
+    # capped by the significance of the split that contains it. A point is
+    # kept iff its significance exceeds the tolerance (classic recursive DP).
+    distances = [0.0] * len(points)
+    stack = [(0, len(points) - 1, math.inf)]
+    while stack:
+        first, last, parent = stack.pop()
+        max_distance, index = -1.0, None
+        for i in range(first + 1, last):
+            distance = _segment_distance(points[i], points[first], points[last])
+            if distance > max_distance:
+                max_distance, index = distance, i
+        if index is not None:
+            significance = min(max_distance, parent)
+            distances[index] = significance
+            stack.append((first, index, significance))
+            stack.append((index, last, significance))
+
+    # Endpoints always stay; keep the most significant points if a closed
+    # ring would otherwise collapse.
+    keep = {0, len(points) - 1}
+    keep.update(i for i, distance in enumerate(distances) if distance > tolerance)
+    for i in sorted(range(len(points)), key=lambda i: -distances[i]):
+        if len(keep) >= min_points:
+            break
+        keep.add(i)
+    return sorted(keep)
+
+
+def visvalingam(points, tolerance, min_points=2):
+    """
+    Indices of `points` kept by Visvalingam-Whyatt.
+
+    Points are removed by smallest effective triangle area until every
+    remaining area exceeds tolerance**2 (areas are compared in squared units).
+    """
+    count = len(points)
+    if count <= min_points:
+        return list(range(count))
+
+    threshold = tolerance * tolerance
+    previous = list(range(-1, count - 1))
+    following = list(range(1, count + 1))
+    removed = [False] * count
+    heap = [
+        (_triangle_area(points[i - 1], points[i], points[i + 1]), i)
+        for i in range(1, count - 1)
+    ]
+    heapq.heapify(heap)
+    current_area = {i: area for area, i in heap}
+    remaining = count
+
+    while heap and remaining > min_points:
+        area, i = heapq.heappop(heap)
+        if removed[i] or current_area.get(i) != area:
+            continue  # stale heap entry
+        if area > threshold:
+            break
+
+        removed[i] = True
+        remaining -= 1
+        before, after = previous[i], following[i]
+        following[before] = after
+        previous[after] = before
+
+        for neighbour in (before, after):
+            if 0 < neighbour < count - 1:
+                # Effective area never decreases, so earlier removals stay
+                # consistent with the ones around them
+                new_area = max(
+                    area,
+                    _triangle_area(
+                        points[previous[neighbour]],
+                        points[neighbour],
+                        points[following[neighbour]],
+                    ),
+                )
+                current_area[neighbour] = new_area
+                heapq.heappush(heap, (new_area, neighbour))
+
+    return [i for i in range(count) if not removed[i]]
+
+
+def simplify_arc(arc, transform, tolerance, algorithm, min_points=2):
+    """
+    Simplify a quantized arc, keeping at least `min_points` of its points;
+    `tolerance` is in input units (degrees).
+    """
+    if tolerance <= 0 or len(arc) <= max(2, min_points):
+        return arc
+
+    # Measure in input units, the grid cells are not square
+    scaled = [(x * transform.scale[0], y * transform.scale[1]) for x, y in arc]
+    if algorithm == "douglas-peucker":
+        keep = douglas_peucker(scaled, tolerance, min_points)
+    elif algorithm == "visvalingam":
+        keep = visvalingam(scaled, tolerance, min_points)
+    else:
+        raise ValueError(f"Unknown simplification algorithm: {algorithm}")
+    return [arc[i] for i in keep]
+
+
+def _ring_points(ring_arcs, arcs):
+    """Distinct points of a ring made of (possibly reversed) arc references."""
+    points = set()
+    for index in ring_arcs:
+        points.update(arcs[index if index >= 0 else ~index])
+    return points
+
+
+def _simplify_arcs(arcs, rings, transform, tolerance, algorithm):
+    """
+    Simplify `arcs` and make sure none of the `rings` (lists of arc
+    references) collapses below `MIN_RING_POINTS`.
+
+    The minimum is enforced per arc first. A ring cut into several arcs at
+    junctions can still end up with only its junctions, so its arcs get
+    their most significant interior points back, one at a time, until the
+    ring has enough points again. Shared arcs only gain points, so the
+    rings sharing them stay consistent.
+    """
+    min_points = [
+        MIN_RING_POINTS if len(arc) > 1 and arc[0] == arc[-1] else 2 for arc in arcs
+    ]
+    simplified = [
+        simplify_arc(arc, transform, tolerance, algorithm, min_points[index])
+        for index, arc in enumerate(arcs)
+    ]
+
+    for ring_arcs in rings:
+        # The closing point repeats the first one
+        while len(_ring_points(ring_arcs, simplified)) + 1 < MIN_RING_POINTS:
+            indices = (index if index >= 0 else ~index for index in ring_arcs)
+            index = next(
+                (i for i in indices if len(simplified[i]) < len(arcs[i])), None
+            )
+            if index is None:
+                break  # degenerate ring, nothing left to restore
+            min_points[index] = len(simplified[index]) + 1
+            simplified[index] = simplify_arc(
+                arcs[index], transform, tolerance, algorithm, min_points[index]
+            )
+    return simplified
+
+
+def _geometry_polygons(geometry):
+    """Polygons of a TopoJSON (Multi)Polygon geometry as lists of arc rings."""
+    if geometry["type"] == "Polygon":
+        return [geometry["arcs"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["arcs"]
+    return []
+
+
+def _delta_encode(arc):
+    encoded = [list(arc[0])]
+    for (x0, y0), (x1, y1) in itertools.pairwise(arc):
+        encoded.append([x1 - x0, y1 - y0])
+    return encoded
+
+
+def geojson_to_topojson(
+    geojson, object_name, quantization=10000, tolerance=0.0, algorithm="visvalingam"
+):
+    """
+    Convert a GeoJSON FeatureCollection into a simplified TopoJSON dict.
+
+    `tolerance` is relative to the larger side of the bounding box, so every
+    country is simplified to the same level of detail at the same display
+    size (an absolute tolerance would erase Monaco and barely touch Canada).
+    """
+    features = geojson.get("features", [])
+    bbox = _bbox(features)
+    transform = Transform(bbox, quantization)
+    absolute_tolerance = tolerance * max(bbox[2] - bbox[0], bbox[3] - bbox[1])
+
+    # 1. quantize
+    quantized_features = []
+    for feature in features:
+        polygons = []
+        for polygon in _polygons(feature.get("geometry")):
+            rings = [_quantize_ring(ring, transform) for ring in polygon]
+            rings = [ring for ring in rings if len(ring) >= MIN_RING_POINTS]
+            if rings:
+                polygons.append(rings)
+        quantized_features.append((feature, polygons))
+
+    # 2. topology
+    all_rings = [
+        ring
+        for _feature, polygons in quantized_features
+        for p in polygons
+        for ring in p
+    ]
+    junctions = _find_junctions(all_rings)
+    arc_index = _ArcIndex()
+
+    geometries = []
+    for feature, polygons in quantized_features:
+        polygon_arcs = [
+            [
+                [
+                    arc_index.add(arc, closed)
+                    for arc, closed in _cut_ring(ring, junctions)
+                ]
+                for ring in polygon
+            ]
+            for polygon in polygons
+        ]
+        geometry = {"properties": feature.get("properties") or {}}
+        if not polygon_arcs:
+            geometry["type"] = None
+        elif len(polygon_arcs) == 1:
+            geometry["type"] = "Polygon"
+            geometry["arcs"] = polygon_arcs[0]
+        else:
+            geometry["type"] = "MultiPolygon"
+            geometry["arcs"] = polygon_arcs
+        geometries.append(geometry)
+
+    # 3. simplify
+    rings = [
+        ring_arcs
+        for geometry in geometries
+        for polygon in _geometry_polygons(geometry)
+        for ring_arcs in polygon
+    ]
+    simplified = _simplify_arcs(
+        arc_index.arcs, rings, transform, absolute_tolerance, algorithm
+    )
+
+    # 4. delta-encode
+    arcs = [_delta_encode(arc) for arc in simplified]
+
+    return {
+        "type": "Topology",
+        "bbox": list(bbox),
+        "transform": transform.to_json(),
+        "objects": {
+            object_name: {"type": "GeometryCollection", "geometries": geometries}
+        },
+        "arcs": arcs,
+    }
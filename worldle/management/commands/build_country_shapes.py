@@ -0,0 +1,141 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from lib.compression import compress_variants
+from worldle.geometry import ALGORITHMS, geojson_to_topojson
+
+WORLDLE_STATIC_DIR = Path(settings.BASE_DIR) / "static" / "worldle"
+
+# File extension of each precompressed variant
+PRECOMPRESSED_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+
+def format_size(size):
+    return f"{size / 1024:.1f} KB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Simplify and quantize the country shapes in static/worldle/*.geo.json "
+        "and write them as TopoJSON (<cca3>.min.topo.json) with shared arcs"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "countries",
+            nargs="*",
+            help="cca3 codes to convert (e.g. che can). Default: all countries",
+        )
+        parser.add_argument(
+            "--algorithm",
+            choices=ALGORITHMS,
+            default="visvalingam",
+            help="Line simplification algorithm. Default: visvalingam",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.002,
+            help=(
+                "Simplification tolerance relative to the larger side of each "
+                "country's bounding box (0 disables simplification). Default: 0.002"
+            ),
+        )
+        parser.add_argument(
+            "--quantization",
+            type=int,
+            default=10000,
+            help="Grid size used to quantize coordinates. Default: 10000",
+        )
+        parser.add_argument(
+            "--source-dir",
+            type=Path,
+            default=WORLDLE_STATIC_DIR,
+            help="Directory with the <cca3>.geo.json files",
+        )
+        parser.add_argument(
+            "--output-dir",
+            type=Path,
+            default=WORLDLE_STATIC_DIR,
+            help="Directory the TopoJSON files are written to",
+        )
+        parser.add_argument(
+            "--no-precompress",
+            action="store_true",
+            help=(
+                "Do not write .gz/.br variants (e.g. when collectstatic "
+                "compresses the files anyway)"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["quantization"] < 2:
+            raise CommandError("--quantization must be at least 2")
+        if options["tolerance"] < 0:
+            raise CommandError("--tolerance must not be negative")
+
+        source_dir = options["source_dir"]
+        output_dir = options["output_dir"]
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        if options["countries"]:
+            sources = [
+                source_dir / f"{cca3.lower()}.geo.json" for cca3 in options["countries"]
+            ]
+            missing = [str(path) for path in sources if not path.exists()]
+            if missing:
+                raise CommandError(f"No GeoJSON file found: {', '.join(missing)}")
+        else:
+            sources = sorted(source_dir.glob("*.geo.json"))
+            if not sources:
+                raise CommandError(f"No *.geo.json files found in {source_dir}")
+
+        total_before = total_after = total_compressed = 0
+        for source in sources:
+            cca3 = source.name.removesuffix(".geo.json")
+            with open(source, "r", encoding="utf-8") as f:
+                geojson = json.load(f)
+
+            topology = geojson_to_topojson(
+                geojson,
+                cca3,
+                quantization=options["quantization"],
+                tolerance=options["tolerance"],
+                algorithm=options["algorithm"],
+            )
+            content = json.dumps(topology, separators=(",", ":")).encode()
+
+            target = output_dir / f"{cca3}.min.topo.json"
+            target.write_bytes(content)
+
+            variants = compress_variants(content)
+            if not options["no_precompress"]:
+                for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+                    if encoding in variants:
+                        Path(f"{target}{suffix}").write_bytes(variants[encoding])
+
+            before = source.stat().st_size
+            after = len(content)
+            compressed = min(len(data) for data in variants.values())
+            total_before += before
+            total_after += after
+            total_compressed += compressed
+
+            if options["verbosity"] >= 1:
+                self.stdout.write(
+                    f"{cca3}: {format_size(before)} -> {format_size(after)} "
+                    f"({format_size(compressed)} compressed), "
+                    f"-{100 - after * 100 / before:.0f}%"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {len(sources)} countries: {format_size(total_before)} -> "
+                f"{format_size(total_after)} "
+                f"({format_size(total_compressed)} compressed), "
+                f"-{100 - total_after * 100 / total_before:.0f}%"
+            )
+        )
@@ -0,0 +1,142 @@
+import gzip
+import hashlib
+import json
+from pathlib import Path
+from xml.etree.ElementTree import ParseError
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from worldle.country_data import CountryData, CountryHeader
+from worldle.flags import FLAGS_DIR, MANIFEST_NAME, build_sprite, minify_svg
+
+WORLDLE_STATIC_DIR = Path(settings.BASE_DIR) / "static" / "worldle"
+
+
+def format_size(size):
+    return f"{size / 1024:.1f} KB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Minify the flags in static/worldle/*.svg and build per-region sprite "
+        "sheets plus a manifest in static/worldle/flags/"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--precision",
+            type=int,
+            default=5,
+            help="Significant digits kept for coordinates. Default: 5",
+        )
+        parser.add_argument(
+            "--no-sprites",
+            action="store_true",
+            help="Only minify the flags, don't build sprite sheets",
+        )
+        parser.add_argument(
+            "--max-sprite-flag-size",
+            type=int,
+            default=20 * 1024,
+            help=(
+                "Flags bigger than this (bytes, minified) are served on their "
+                "own instead of bloating their region's sprite. Default: 20480"
+            ),
+        )
+        parser.add_argument(
+            "--source-dir",
+            type=Path,
+            default=WORLDLE_STATIC_DIR,
+            help="Directory with the <cca3>.svg flags",
+        )
+        parser.add_argument(
+            "--output-dir",
+            type=Path,
+            default=FLAGS_DIR,
+            help="Directory the flags, sprites and manifest are written to",
+        )
+
+    def handle(self, *args, **options):
+        if options["precision"] < 1:
+            raise CommandError("--precision must be at least 1")
+
+        source_dir = options["source_dir"]
+        output_dir = options["output_dir"]
+        sources = sorted(source_dir.glob("*.svg"))
+        if not sources:
+            raise CommandError(f"No *.svg files found in {source_dir}")
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        # Static paths in the manifest are relative to STATIC_URL
+        static_prefix = f"worldle/{output_dir.name}"
+        regions = {
+            entry[CountryHeader.cca3].strip().lower(): entry[CountryHeader.region]
+            .strip()
+            .lower()
+            for entry in CountryData().get_csv_entries()
+        }
+
+        flags = {}
+        manifest = {"flags": {}}
+        total_before = total_after = 0
+        for source in sources:
+            cca3 = source.stem
+            content = source.read_bytes()
+            try:
+                minified = minify_svg(content, precision=options["precision"])
+            except (ParseError, ValueError) as e:
+                raise CommandError(f"Could not minify {source.name}: {e}") from e
+            data = minified.encode()
+            (output_dir / source.name).write_bytes(data)
+
+            flags[cca3] = minified
+            manifest["flags"][cca3] = {"url": f"{static_prefix}/{source.name}"}
+            total_before += len(content)
+            total_after += len(data)
+
+            if options["verbosity"] > 1:
+                self.stdout.write(
+                    f"{cca3}: {format_size(len(content))} -> {format_size(len(data))}"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {len(sources)} flags: {format_size(total_before)} -> "
+                f"{format_size(total_after)} "
+                f"(-{100 - total_after * 100 / total_before:.0f}%)"
+            )
+        )
+
+        if not options["no_sprites"]:
+            by_region = {}
+            for cca3, minified in flags.items():
+                if (
+                    regions.get(cca3)
+                    and len(minified.encode()) <= options["max_sprite_flag_size"]
+                ):
+                    by_region.setdefault(regions[cca3], {})[cca3] = minified
+
+            for region, region_flags in sorted(by_region.items()):
+                sprite, positions = build_sprite(region_flags)
+                name = f"sprite-{region}.svg"
+                data = sprite.encode()
+                (output_dir / name).write_bytes(data)
+
+                for cca3, view in positions.items():
+                    manifest["flags"][cca3]["sprite"] = f"{static_prefix}/{name}"
+                    manifest["flags"][cca3]["view"] = list(view)
+
+                self.stdout.write(
+                    f"🗺️  {name}: {len(region_flags)} flags, "
+                    f"{format_size(len(data))} "
+                    f"({format_size(len(gzip.compress(data)))} gzipped)"
+                )
+
+        manifest["version"] = hashlib.sha256(
+            json.dumps(manifest, sort_keys=True).encode()
+        ).hexdigest()[:12]
+        with open(output_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Manifest written to {output_dir}"))
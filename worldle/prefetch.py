@@ -0,0 +1,79 @@
+"""
+Draw the countries of the next competitive rounds ahead of time, so the
+client can fetch their flags before they are needed.
+
+The upcoming countries are kept per game mode in the session. Every response
+carries the flag URLs of the next `PREFETCH_ROUNDS` rounds: as `<link>` hints
+(and a `Link` header, which proxies can turn into 103 Early Hints) on the
+initial render, and as a `prefetch` list in the JSON of every answer.
+"""
+
+from .country_data import CountryData
+
+PREFETCH_ROUNDS = 2
+SESSION_KEY = "upcoming_countries"
+
+
+def draw_country(request, header):
+    """Take the next country for the game mode `header` and refill the queue."""
+    queues = request.session.get(SESSION_KEY, {})
+    queue = queues.get(header) or CountryData().get_random_countries(
+        1, filter_empty=[header]
+    )
+    country = queue.pop(0)
+    queues[header] = queue
+    request.session[SESSION_KEY] = queues
+    fill_upcoming(request, header)
+    return country
+
+
+def fill_upcoming(request, header):
+    """Make sure `PREFETCH_ROUNDS` countries are queued for `header`."""
+    queues = request.session.get(SESSION_KEY, {})
+    queue = queues.get(header, [])
+    missing = PREFETCH_ROUNDS - len(queue)
+    if missing > 0:
+        queue += CountryData().get_random_countries(missing, filter_empty=[header])
+        queues[header] = queue
+        request.session[SESSION_KEY] = queues
+    return queue
+
+
+def _without_fragment(url):
+    # Flags in a sprite only differ by fragment, one fetch covers them all
+    return url.partition("#")[0]
+
+
+def upcoming_flag_urls(request, header, exclude=()):
+    """Distinct flag URLs of the queued countries, minus `exclude`."""
+    skip = {_without_fragment(url) for url in exclude}
+    urls = []
+    for country in fill_upcoming(request, header):
+        url = _without_fragment(CountryData.clean_country_data(country)["image_url"])
+        if url not in skip and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def flag_hints(request, header, current_urls):
+    """
+    Template context for `components/_flag_hints.html`: preload the flags
+    shown right away, prefetch the ones of the next rounds.
+    """
+    preload = []
+    for url in map(_without_fragment, current_urls):
+        if url not in preload:
+            preload.append(url)
+    return {
+        "preload_flag_urls": preload,
+        "prefetch_flag_urls": upcoming_flag_urls(request, header, exclude=preload),
+    }
+
+
+def add_flag_link_header(response, hints):
+    """Repeat the hints as `Link` header (103 Early Hints at the proxy)."""
+    links = [f"<{url}>; rel=preload; as=image" for url in hints["preload_flag_urls"]]
+    links += [f"<{url}>; rel=prefetch" for url in hints["prefetch_flag_urls"]]
+    if links:
+        response["Link"] = ", ".join(links)
+    return response
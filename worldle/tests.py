@@ -1,8 +1,23 @@
-from django.test import RequestFactory, TestCase
+import json
+import math
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.templatetags.static import static
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
 from unittest.mock import patch
 
 from accounts.models import CustomUser
+from worldle.country_data import CountryData, CountryHeader
+from worldle.dataset import DATASET_FIELDS, get_dataset_url, get_dataset_version
+from worldle.flags import build_sprite, load_flag_manifest, minify_svg
+from worldle.prefetch import PREFETCH_ROUNDS, SESSION_KEY
+from worldle.geometry import ALGORITHMS, MIN_RING_POINTS, geojson_to_topojson
 from worldle.views import DEFAULT_REGION
 
 
@@ -312,3 +327,352 @@ class WorldleModelsTest(TestCase):
         self.assertEqual(self.user.capitals_highscore, 250)
         self.assertEqual(self.user.currencies_highscore, 75)
         self.assertEqual(self.user.languages_highscore, 180)
+
+
+class CountryShapesTest(TestCase):
+    def feature(self, cca2, coordinates):
+        return {
+            "type": "Feature",
+            "properties": {"cca2": cca2},
+            "geometry": {"type": "Polygon", "coordinates": [coordinates]},
+        }
+
+    def test_shared_border_is_stored_once(self):
+        """Two squares sharing an edge reference the same arc"""
+        left = [[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]
+        right = [[1, 0], [2, 0], [2, 1], [1, 1], [1, 0]]
+        geojson = {
+            "type": "FeatureCollection",
+            "features": [self.feature("AA", left), self.feature("BB", right)],
+        }
+
+        topology = geojson_to_topojson(geojson, "test", quantization=3)
+
+        self.assertEqual(topology["type"], "Topology")
+        geometries = topology["objects"]["test"]["geometries"]
+        left_arcs = set(geometries[0]["arcs"][0])
+        right_arcs = set(geometries[1]["arcs"][0])
+        shared = {arc if arc >= 0 else ~arc for arc in left_arcs} & {
+            arc if arc >= 0 else ~arc for arc in right_arcs
+        }
+        self.assertEqual(len(shared), 1)
+        self.assertEqual(len(topology["arcs"]), 3)
+
+    def test_simplification_reduces_points(self):
+        """A noisy ring loses points but never collapses"""
+        ring = [
+            [
+                math.cos(2 * math.pi * i / 500) * (1 + (i % 2) * 0.001),
+                math.sin(2 * math.pi * i / 500) * (1 + (i % 2) * 0.001),
+            ]
+            for i in range(500)
+        ]
+        ring.append(ring[0])
+        geojson = {"type": "FeatureCollection", "features": [self.feature("CC", ring)]}
+
+        for algorithm in ALGORITHMS:
+            with self.subTest(algorithm=algorithm):
+                topology = geojson_to_topojson(
+                    geojson, "test", tolerance=0.01, algorithm=algorithm
+                )
+                points = sum(len(arc) for arc in topology["arcs"])
+                self.assertLess(points, 100)
+                self.assertGreaterEqual(points, 4)
+
+                huge = geojson_to_topojson(
+                    geojson, "test", tolerance=10, algorithm=algorithm
+                )
+                self.assertEqual(sum(len(arc) for arc in huge["arcs"]), 4)
+
+    def test_rings_cut_into_arcs_never_collapse(self):
+        """Rings made of several arcs keep enough points after simplification"""
+        source = Path(settings.BASE_DIR) / "static" / "worldle" / "usa.geo.json"
+        geojson = json.loads(source.read_text())
+
+        for algorithm in ALGORITHMS:
+            with self.subTest(algorithm=algorithm):
+                topology = geojson_to_topojson(
+                    geojson, "usa", tolerance=0.002, algorithm=algorithm
+                )
+                arcs = []
+                for encoded in topology["arcs"]:
+                    x = y = 0
+                    points = []
+                    for dx, dy in encoded:
+                        x, y = x + dx, y + dy
+                        points.append((x, y))
+                    arcs.append(points)
+
+                (geometry,) = topology["objects"]["usa"]["geometries"]
+                for polygon in geometry["arcs"]:
+                    for ring in polygon:
+                        points = set()
+                        for index in ring:
+                            points.update(arcs[index if index >= 0 else ~index])
+                        # Distinct points plus the closing point
+                        self.assertGreaterEqual(len(points) + 1, MIN_RING_POINTS)
+
+    def test_build_country_shapes_command(self):
+        """The command writes a smaller TopoJSON file per country"""
+        with tempfile.TemporaryDirectory() as output_dir:
+            out = StringIO()
+            call_command(
+                "build_country_shapes", "che", output_dir=Path(output_dir), stdout=out
+            )
+
+            target = Path(output_dir) / "che.min.topo.json"
+            topology = json.loads(target.read_text())
+            self.assertIn("che", topology["objects"])
+            self.assertTrue(Path(f"{target}.gz").exists())
+            source = Path(settings.BASE_DIR) / "static" / "worldle" / "che.geo.json"
+            self.assertLess(target.stat().st_size, source.stat().st_size)
+            self.assertIn("che:", out.getvalue())
+            self.assertIn("1 countries", out.getvalue())
+
+    def test_build_country_shapes_unknown_country(self):
+        with self.assertRaises(CommandError):
+            call_command("build_country_shapes", "xyz", stdout=StringIO())
+
+
+class FlagsTest(TestCase):
+    def tearDown(self):
+        load_flag_manifest.cache_clear()
+
+    def test_minify_svg_strips_metadata_and_rounds(self):
+        content = (
+            '<?xml version="1.0"?><!-- editor comment -->'
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            'xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape" '
+            'viewBox="0 0 10 10" inkscape:version="1.0">'
+            "<metadata>meta</metadata><title>Flag</title>"
+            '<rect id="unused" width="10.0000001" height="0.1234567"/></svg>'
+        )
+
+        minified = minify_svg(content)
+
+        self.assertNotIn("metadata", minified)
+        self.assertNotIn("inkscape", minified)
+        self.assertNotIn("comment", minified)
+        self.assertNotIn("unused", minified)
+        self.assertIn('width="10"', minified)
+        self.assertIn('height=".12346"', minified)
+
+    def test_minify_svg_merges_disjoint_paths_only(self):
+        content = (
+            '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">'
+            '<path fill="red" d="M0 0h1v1H0z"/>'
+            '<path fill="red" d="m5 5 1 0 0 1z"/>'
+            '<path fill="red" d="M5.5 5.5h2v2h-2z"/>'
+            '<path fill="blue" d="M8 8h1v1H8z"/></svg>'
+        )
+
+        minified = minify_svg(content)
+
+        # The first two are merged, the third overlaps the second
+        self.assertIn('d="M0 0h1v1H0zM5 5l1 0 0 1z"', minified)
+        self.assertEqual(minified.count("<path"), 3)
+
+    def test_build_sprite_prefixes_ids(self):
+        flag = (
+            '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 20 10">'
+            '<defs><linearGradient id="g"/></defs>'
+            '<rect fill="url(#g)" width="20" height="10"/></svg>'
+        )
+
+        sprite, positions = build_sprite({"aaa": flag, "bbb": flag})
+
+        self.assertEqual(positions["aaa"], (0, 0, 300, 150))
+        self.assertEqual(positions["bbb"][1], 154)
+        self.assertIn('<view id="bbb" viewBox="0 154 300 150"', sprite)
+        self.assertIn('id="aaa-g"', sprite)
+        self.assertIn("url(#bbb-g)", sprite)
+        self.assertNotIn('id="g"', sprite)
+
+    # Flag sprites are not part of the collected static files in tests
+    @override_settings(
+        STORAGES={
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+            "staticfiles": {
+                "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+            },
+        }
+    )
+    def test_clean_country_data_uses_sprite(self):
+        country = {"name.common": " Switzerland ", "cca3": "CHE"}
+
+        with patch("worldle.flags.load_flag_manifest", return_value={}):
+            self.assertEqual(
+                CountryData.clean_country_data(country)["image_url"],
+                static("worldle/che.svg"),
+            )
+
+        manifest = {
+            "flags": {
+                "che": {
+                    "url": "worldle/flags/che.svg",
+                    "sprite": "worldle/flags/sprite-europe.svg",
+                }
+            }
+        }
+        with patch("worldle.flags.load_flag_manifest", return_value=manifest):
+            cleaned = CountryData.clean_country_data(country)
+        self.assertEqual(cleaned["name"], "Switzerland")
+        self.assertEqual(
+            cleaned["image_url"], static("worldle/flags/sprite-europe.svg") + "#che"
+        )
+
+    def test_build_flags_command(self):
+        with tempfile.TemporaryDirectory() as source_dir:
+            with tempfile.TemporaryDirectory() as output_dir:
+                for cca3 in ("che", "deu"):
+                    source = Path(settings.BASE_DIR) / "static" / "worldle"
+                    Path(source_dir, f"{cca3}.svg").write_bytes(
+                        (source / f"{cca3}.svg").read_bytes()
+                    )
+
+                call_command(
+                    "build_flags",
+                    source_dir=Path(source_dir),
+                    output_dir=Path(output_dir),
+                    stdout=StringIO(),
+                )
+
+                manifest = json.loads(Path(output_dir, "manifest.json").read_text())
+                self.assertEqual(
+                    manifest["flags"]["che"]["sprite"],
+                    f"worldle/{Path(output_dir).name}/sprite-europe.svg",
+                )
+                sprite = Path(output_dir, "sprite-europe.svg").read_text()
+                self.assertIn('<view id="che"', sprite)
+                self.assertIn('<view id="deu"', sprite)
+                self.assertTrue(Path(output_dir, "che.svg").exists())
+
+
+class FlagPrefetchTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username="prefetcher", email="prefetch@example.com", password="testpass"
+        )
+        self.user.is_email_verified = True
+        self.user.save()
+        self.client.force_login(self.user)
+
+    def test_initial_render_has_flag_hints(self):
+        response = self.client.get(reverse("worldle:competitive_capitals"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("rel=preload; as=image", response["Link"])
+        self.assertContains(response, '<link rel="preload" as="image"')
+        queue = self.client.session[SESSION_KEY][CountryHeader.capital]
+        self.assertEqual(len(queue), PREFETCH_ROUNDS)
+        for url in response.context["prefetch_flag_urls"]:
+            self.assertContains(
+                response, f'<link rel="prefetch" as="image" href="{url}">'
+            )
+
+    def test_answer_uses_queued_country_and_returns_prefetch(self):
+        self.client.get(reverse("worldle:competitive_capitals"))
+        upcoming = self.client.session[SESSION_KEY][CountryHeader.capital][0]
+
+        response = self.client.post(
+            reverse("worldle:competitive_capitals"), {"choice": "nowhere"}
+        )
+
+        data = response.json()
+        self.assertEqual(data["country"], CountryData.clean_country_data(upcoming))
+        self.assertLessEqual(len(data["prefetch"]), PREFETCH_ROUNDS)
+        self.assertNotIn(data["country"]["image_url"], data["prefetch"])
+        self.assertEqual(
+            len(self.client.session[SESSION_KEY][CountryHeader.capital]),
+            PREFETCH_ROUNDS,
+        )
+
+
+class CountryDatasetTest(TestCase):
+    def test_dataset_is_served_immutable(self):
+        response = self.client.get(get_dataset_url())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIn("immutable", response["Cache-Control"])
+        data = json.loads(response.content)
+        self.assertEqual(data["version"], get_dataset_version())
+        self.assertEqual(data["fields"], list(DATASET_FIELDS))
+        self.assertEqual(len(data["countries"]), len(CountryData.get_csv_entries()))
+
+    def test_dataset_rows_match_csv(self):
+        data = json.loads(self.client.get(get_dataset_url()).content)
+        entry = CountryData.get_csv_entries()[0]
+        row = dict(zip(data["fields"], data["countries"][0]))
+
+        self.assertEqual(row["cca3"], entry[CountryHeader.cca3].strip().lower())
+        self.assertEqual(row["name"], entry[CountryHeader.common_name].strip())
+        self.assertEqual(row["region"], entry[CountryHeader.region].strip().lower())
+
+    def test_stale_version_redirects_to_current(self):
+        response = self.client.get(reverse("worldle_dataset", args=["000000000000"]))
+
+        self.assertRedirects(response, get_dataset_url(), fetch_redirect_response=False)
+
+    def test_service_worker(self):
+        url = reverse("worldle:service_worker")
+        # Its scope is the directory it is served from
+        self.assertRegex(url, r"^/[a-z]{2}/worldle/sw\.js$")
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Service-Worker-Allowed", response)
+        self.assertEqual(response["Content-Type"], "application/javascript")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        self.assertContains(response, get_dataset_url())
+        self.assertContains(response, get_dataset_version())
+
+    def test_practice_page_initializes_client_side_rounds(self):
+        response = self.client.get(reverse("worldle:capitals", args=[DEFAULT_REGION]))
+
+        self.assertContains(response, "initPractice(")
+        self.assertContains(response, get_dataset_url())
+        self.assertContains(response, reverse("worldle:service_worker"))
+
+
+class PracticeQuestionTest(TestCase):
+    def test_next_question(self):
+        response = self.client.get(
+            reverse("worldle:next_capitals_question", args=["europe"])
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-cache", response["Cache-Control"])
+        data = response.json()
+        self.assertEqual(set(data), {"cca3", "name", "flag", "solution"})
+        entry = next(
+            entry
+            for entry in CountryData().get_csv_entries()
+            if entry[CountryHeader.cca3].strip().lower() == data["cca3"]
+        )
+        self.assertEqual(entry[CountryHeader.region].strip().lower(), "europe")
+        self.assertTrue(data["solution"])
+
+    def test_next_question_excludes_current_country(self):
+        entries = CountryData().get_filtered_entries("europe", CountryHeader.languages)
+        current = entries[0][CountryHeader.cca3].strip().lower()
+        url = reverse("worldle:next_languages_question", args=["europe"])
+
+        for _ in range(20):
+            response = self.client.get(url, {"exclude": current})
+            self.assertNotEqual(response.json()["cca3"], current)
+
+    def test_next_question_invalid_region(self):
+        response = self.client.get(
+            reverse("worldle:next_capitals_question", args=["atlantis"])
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_filtered_entries_are_indexed(self):
+        entries = CountryData().get_filtered_entries("asia", CountryHeader.capital)
+
+        self.assertIs(
+            entries, CountryData().get_filtered_entries("Asia", CountryHeader.capital)
+        )
+        self.assertTrue(all(entry[CountryHeader.capital].strip() for entry in entries))
@@ -8,6 +8,8 @@ app_name = "worldle"
 urlpatterns = [
     # HOME
     path("", views.home, name="home"),
+    # OFFLINE SUPPORT
+    path("sw.js", views.service_worker, name="service_worker"),
     # LEADERBOARDS
     path("leaderboards/", views.leaderboards, name="leaderboards"),
     path(
@@ -21,6 +23,12 @@ urlpatterns = [
         "capitals/competitive/", views.competitive_capitals, name="competitive_capitals"
     ),
     path("capitals/<str:region>/", views.capitals, name="capitals"),
+    path(
+        "capitals/<str:region>/next/",
+        views.next_practice_question,
+        {"mode": "capitals"},
+        name="next_capitals_question",
+    ),
     # CURRENCIES
     path(
         "code_to_currency_name/<str:code>/",
@@ -40,6 +48,12 @@ urlpatterns = [
         name="competitive_languages",
     ),
     path("languages/<str:region>/", views.languages, name="languages"),
+    path(
+        "languages/<str:region>/next/",
+        views.next_practice_question,
+        {"mode": "languages"},
+        name="next_languages_question",
+    ),
     # AREAS
     path("areas/competitive/", views.competitive_areas, name="competitive_areas"),
 ]
@@ -1,8 +1,11 @@
 import random
 
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
 from django.http import Http404, JsonResponse
 from django.shortcuts import redirect, render
+from django.templatetags.static import static
 from django.urls import reverse
+from django.utils.cache import add_never_cache_headers
 from django.contrib.auth.decorators import login_required
 
 from .leaders import get_leaders, LeaderDatabase
@@ -13,6 +16,18 @@ from .country_data import (
     VALID_REGIONS,
 )
 from .currency_data import CurrencyData
+from .flags import get_flag_url
+from .dataset import get_dataset_entry, get_dataset_url, get_dataset_version
+from .prefetch import (
+    add_flag_link_header,
+    draw_country,
+    flag_hints,
+    upcoming_flag_urls,
+)
+from lib.build_info import get_build_time, get_version
+from lib.compression import serve_precompressed
+from lib.conditional import anonymous_last_modified
+from lib.page_cache import anonymous_page_cache
 from lib.seo_utils import (
     get_worldle_home_seo,
     get_worldle_capitals_seo,
@@ -23,6 +38,8 @@ from lib.seo_utils import (
 )
 
 
+@anonymous_last_modified(lambda request: get_build_time())
+@anonymous_page_cache()
 def home(request):
     from .cards import (
         capitals_card,
@@ -68,6 +85,8 @@ def leaderboard_data(request, highscore_db: str):
     return JsonResponse(data, safe=False)
 
 
+@anonymous_last_modified(lambda request: get_build_time())
+@anonymous_page_cache()
 def leaderboards(request):
     context = {}
     context["leaderboard_configs"] = [
@@ -125,7 +144,10 @@ def capitals(request, region):
         "region": region,
         "country_image_name": country_image_name,
         "country_name": country_name,
+        "country_cca3": country_cca3,
         "country_capital": country_capital,
+        # Further questions are drawn client-side, see quiz.js
+        "dataset_url": get_dataset_url(),
     }
 
     # Add SEO data
@@ -148,9 +170,7 @@ def capitals(request, region):
 @login_required
 def competitive_capitals(request):
     if request.method == "GET":
-        country = CountryData().get_random_countries(
-            1, filter_empty=[CountryHeader.capital]
-        )[0]
+        country = draw_country(request, CountryHeader.capital)
         request.session["country"] = country
 
         score = 0
@@ -174,6 +194,9 @@ def competitive_capitals(request):
             "choices": choices,
             "score": score,
             "highscore": capitals_highscore,
+            **flag_hints(
+                request, CountryHeader.capital, [country_cleaned["image_url"]]
+            ),
         }
 
         # Add SEO data
@@ -182,11 +205,12 @@ def competitive_capitals(request):
             context, seo_data, request=request, url_name="worldle:competitive_capitals"
         )
 
-        return render(
+        response = render(
             request,
             "worldle/competitive_capitals.html",
             context,
         )
+        return add_flag_link_header(response, context)
 
     elif request.method == "POST":
         country = request.session.get("country")
@@ -210,9 +234,7 @@ def competitive_capitals(request):
             capitals_highscore = score
 
         # generate new country
-        country = CountryData().get_random_countries(
-            1, filter_empty=[CountryHeader.capital]
-        )[0]
+        country = draw_country(request, CountryHeader.capital)
         request.session["country"] = country
 
         country_cleaned = CountryData().clean_country_data(country)
@@ -234,6 +256,9 @@ def competitive_capitals(request):
                 "highscore": capitals_highscore,
                 "is_correct": is_correct,
                 "correct_answers": ", ".join(correct_answers_old).upper(),
+                "prefetch": upcoming_flag_urls(
+                    request, CountryHeader.capital, [country_cleaned["image_url"]]
+                ),
             }
         )
 
@@ -263,7 +288,10 @@ def languages(request, region):
         "region": region,
         "country_image_name": country_image_name,
         "country_name": country_name,
+        "country_cca3": country_cca3,
         "country_languages": country_languages,
+        # Further questions are drawn client-side, see quiz.js
+        "dataset_url": get_dataset_url(),
     }
 
     # Add SEO data
@@ -286,9 +314,7 @@ def languages(request, region):
 @login_required
 def competitive_languages(request):
     if request.method == "GET":
-        country = CountryData().get_random_countries(
-            1, filter_empty=[CountryHeader.languages]
-        )[0]
+        country = draw_country(request, CountryHeader.languages)
         request.session["country"] = country
 
         score = 0
@@ -312,6 +338,9 @@ def competitive_languages(request):
             "choices": choices,
             "score": score,
             "highscore": languages_highscore,
+            **flag_hints(
+                request, CountryHeader.languages, [country_cleaned["image_url"]]
+            ),
         }
 
         # Add SEO data
@@ -320,11 +349,12 @@ def competitive_languages(request):
             context, seo_data, request=request, url_name="worldle:competitive_languages"
         )
 
-        return render(
+        response = render(
             request,
             "worldle/competitive_languages.html",
             context,
         )
+        return add_flag_link_header(response, context)
 
     elif request.method == "POST":
         country = request.session.get("country")
@@ -348,9 +378,7 @@ def competitive_languages(request):
             languages_highscore = score
 
         # generate new country
-        country = CountryData().get_random_countries(
-            1, filter_empty=[CountryHeader.languages]
-        )[0]
+        country = draw_country(request, CountryHeader.languages)
         request.session["country"] = country
 
         country_cleaned = CountryData().clean_country_data(country)
@@ -372,6 +400,9 @@ def competitive_languages(request):
                 "highscore": languages_highscore,
                 "is_correct": is_correct,
                 "correct_answers": ", ".join(correct_answers_old).upper(),
+                "prefetch": upcoming_flag_urls(
+                    request, CountryHeader.languages, [country_cleaned["image_url"]]
+                ),
             }
         )
 
@@ -400,6 +431,11 @@ def competitive_areas(request):
             "country2": country2_cleaned,
             "score": score,
             "highscore": areas_highscore,
+            **flag_hints(
+                request,
+                CountryHeader.area,
+                [country1_cleaned["image_url"], country2_cleaned["image_url"]],
+            ),
         }
 
         # Add SEO data
@@ -408,11 +444,12 @@ def competitive_areas(request):
             context, seo_data, request=request, url_name="worldle:competitive_areas"
         )
 
-        return render(
+        response = render(
             request,
             "worldle/competitive_areas.html",
             context,
         )
+        return add_flag_link_header(response, context)
 
     elif request.method == "POST":
         country1 = request.session.get("country1")
@@ -443,9 +480,7 @@ def competitive_areas(request):
 
         # generate new countries
         country1 = country2  # old country2 becomes new country1
-        country2 = CountryData().get_random_countries(
-            1, filter_empty=[CountryHeader.area]
-        )[0]
+        country2 = draw_country(request, CountryHeader.area)
         request.session["country1"] = country1
         request.session["country2"] = country2
 
@@ -461,6 +496,9 @@ def competitive_areas(request):
                 "score": score,
                 "highscore": areas_highscore,
                 "is_correct": is_correct,
+                "prefetch": upcoming_flag_urls(
+                    request, CountryHeader.area, [country2_cleaned["image_url"]]
+                ),
             }
         )
 
@@ -473,9 +511,7 @@ def code_to_currency_name(request, code):
 @login_required
 def competitive_currencies(request):
     if request.method == "GET":
-        country = CountryData().get_random_countries(
-            1, filter_empty=[CountryHeader.currencies]
-        )[0]
+        country = draw_country(request, CountryHeader.currencies)
         request.session["country"] = country
 
         score = 0
@@ -499,6 +535,9 @@ def competitive_currencies(request):
             "choices": choices,
             "score": score,
             "highscore": currencies_highscore,
+            **flag_hints(
+                request, CountryHeader.currencies, [country_cleaned["image_url"]]
+            ),
         }
 
         # Add SEO data
@@ -510,11 +549,12 @@ def competitive_currencies(request):
             url_name="worldle:competitive_currencies",
         )
 
-        return render(
+        response = render(
             request,
             "worldle/competitive_currencies.html",
             context,
         )
+        return add_flag_link_header(response, context)
 
     elif request.method == "POST":
         country = request.session.get("country")
@@ -538,9 +578,7 @@ def competitive_currencies(request):
             currencies_highscore = score
 
         # generate new country
-        country = CountryData().get_random_countries(
-            1, filter_empty=[CountryHeader.currencies]
-        )[0]
+        country = draw_country(request, CountryHeader.currencies)
         request.session["country"] = country
 
         country_cleaned = CountryData().clean_country_data(country)
@@ -562,5 +600,81 @@ def competitive_currencies(request):
                 "highscore": currencies_highscore,
                 "is_correct": is_correct,
                 "correct_answers": ", ".join(correct_answers_old).upper(),
+                "prefetch": upcoming_flag_urls(
+                    request, CountryHeader.currencies, [country_cleaned["image_url"]]
+                ),
             }
         )
+
+
+# Practice mode -> CSV column holding the answer
+PRACTICE_MODES = {
+    "capitals": CountryHeader.capital,
+    "languages": CountryHeader.languages,
+}
+
+
+def next_practice_question(request, mode, region):
+    """
+    Next practice question as JSON, so quiz.js can swap the country in place
+    when the country dataset isn't available. `?exclude=<cca3>` skips the
+    country currently shown.
+    """
+    header = PRACTICE_MODES.get(mode)
+    if header is None or region not in VALID_REGIONS:
+        raise Http404()
+
+    random_row = CountryData().get_random_filtered_entry(
+        region, header, exclude=request.GET.get("exclude")
+    )
+    country_cca3 = random_row[CountryHeader.cca3].strip().lower()
+    solution_list = list(map(str.strip, random_row[header].strip().split(",")))
+
+    response = JsonResponse(
+        {
+            "cca3": country_cca3,
+            "name": random_row[CountryHeader.common_name].strip(),
+            "flag": get_flag_url(country_cca3),
+            "solution": ", ".join(solution_list),
+        }
+    )
+    add_never_cache_headers(response)
+    return response
+
+
+# Versioned per content, so it can be cached forever
+DATASET_MAX_AGE = 31536000
+
+
+def country_dataset(request, version):
+    """Serve the practice dataset, redirecting stale versions to the current one."""
+    current_version, entry = get_dataset_entry()
+    if version != current_version:
+        return redirect(get_dataset_url())
+
+    response = serve_precompressed(request, entry, max_age=DATASET_MAX_AGE)
+    if response.status_code == 200:
+        response["Cache-Control"] += ", immutable"
+    return response
+
+
+def service_worker(request):
+    """
+    Serve the service worker from /<language>/worldle/, which limits its
+    scope to the Worldle pages. It must always be revalidated: browsers only
+    pick up a new worker (and with it a new dataset) when this changes.
+    """
+    context = {
+        "cache_version": f"{get_version()}-{get_dataset_version()}",
+        "hashed_static": isinstance(staticfiles_storage, ManifestFilesMixin),
+        "precache_urls": [
+            get_dataset_url(),
+            static("js/quiz.js"),
+            static("css/animation.css"),
+        ],
+    }
+    response = render(
+        request, "worldle/sw.js", context, content_type="application/javascript"
+    )
+    response["Cache-Control"] = "no-cache"
+    return response